@@ -1,17 +1,28 @@
 import logging
 import os
+import random
 import sys
+import threading
+import time
 from display.menu import display_menu
 from handlers.startWork import start_work
 from handlers.workflows import prompt_end_work
 from handlers.attendance import prompt_attendance, show_attendance_overview
 from handlers.user_profile import show_or_edit_user
+from handlers.export import EXPORT_COMMAND_ALIASES, export_for_user, show_export_usage
+from handlers.slack_cache import get_display_name
+from handlers.commands import CommandRouter
+from display.templates import cached_blocks
+from handlers.event_dedup import event_deduplicator
+from handlers.event_filter import MessagePrefilter
+from handlers.background import action_executor, export_executor
+from db.read_cache import repository_cache
 # チャンネル機能をインポート
-from handlers.channel.handlers import register_channel_handlers
+from handlers.channel.handlers import channel_commands, handle_channel_message, register_channel_handlers
 from boltApp import bolt_app
 from slack_bolt import App
 from slack_bolt.adapter.flask import SlackRequestHandler
-from flask import Flask, request
+from flask import Flask, jsonify, request
 
 def _setup_logging() -> None:
 	logging.basicConfig(
@@ -35,45 +46,142 @@ def _get_env(key: str) -> str | None:
 
 
 
-def main() -> int:
-	# .env を読み込む（存在しない場合は無視）
-	_setup_logging()
-	logger = logging.getLogger("hitechlab-assistant")
+_services_pid: int | None = None
 
 
-	# Slack APIの権限をテスト
-	try:
-		from boltApp import bolt_app
+def start_background_services() -> None:
+	"""検索索引・チャンネル名キャッシュのバックグラウンド処理を開始（プロセスごとに1回）"""
+	global _services_pid
+	if _services_pid == os.getpid():
+		return
+	_services_pid = os.getpid()
 
-		# auth.test を実行して基本権限を確認
-		auth_response = bolt_app.client.auth_test()
+	# メモ検索用 n-gram 索引の構築（任意）
+	if (_get_env("MEMO_SEARCH_INDEX") or "").lower() in {"1", "true", "yes"}:
+		from db.memo_index import memo_search_index
+		memo_search_index.build_async()
 
-		# botのスコープを確認
-		try:
-			scopes_response = bolt_app.client.auth_test()
-		except Exception as scope_error:
-			logger.error(f"Slack APIのスコープ確認に失敗しました: {str(scope_error)}")
+	# チャンネル名キャッシュの事前読み込み（任意）
+	if (_get_env("SLACK_CHANNEL_CACHE_PREWARM") or "").lower() in {"1", "true", "yes"}:
+		from handlers.slack_cache import prewarm_channel_cache
+		threading.Thread(target=prewarm_channel_cache, args=(bolt_app.client,), daemon=True).start()
 
-	except Exception as e:
-		logger.error(f"Slack APIの認証に失敗しました: {str(e)}")
 
-	@bolt_app.event("message")
-	def handle_unified_message(body, say, logger, client):  # type: ignore[no-redef]
-		"""統一メッセージハンドラー - DM/チャンネルを判定して適切な処理に振り分け"""
+# DMコマンドのエイリアス（先頭語、大文字/小文字は区別しない）
+DM_COMMAND_ALIASES = {
+	"menu": ("menu", "メニュー", "めにゅー"),
+	"start": ("出勤開始", "しゅっきん", "start"),
+	"end": ("退勤", "たいきん", "end"),
+	"attendance": ("出勤更新", "予定", "att"),
+	"overview": ("出勤確認", "かくにん", "check"),
+	"user": ("ユーザー情報", "プロフィール", "user"),
+	"help": ("help", "ヘルプ", "使い方"),
+}
 
-		event = body.get("event", {})
 
-		# bot自身やスレッド更新等は無視
-		if event.get("subtype") or event.get("bot_id"):
-			return
+def _dm_menu(event, body, say, client):
+	display_menu(say, body=body, client=client)
+
 
-		channel_type = event.get("channel_type")
-		text = event.get("text", "").strip()
-		user_id = event.get("user")
-		channel_id = event.get("channel")
+def _dm_start(event, body, say, client):
+	start_work(say)
 
 
-		if channel_type == "im":
+def _dm_end(event, body, say, client):
+	# ユーザー情報を取得
+	user_slack_id = event.get("user")
+	display_name = get_display_name(client, user_slack_id)
+
+	from db.repository import get_or_create_user
+	user = get_or_create_user(user_slack_id or "unknown", display_name)
+	prompt_end_work(say, user_id=user.id)
+
+
+def _dm_attendance(event, body, say, client):
+	prompt_attendance(say)
+
+
+def _dm_overview(event, body, say, client):
+	show_attendance_overview(say)
+
+
+def _dm_user(event, body, say, client):
+	# fetch display name and pass slack id
+	user_slack_id = event.get("user")
+	real_name = get_display_name(client, user_slack_id)
+	show_or_edit_user(say, real_name, user_slack_id)
+
+
+@cached_blocks
+def _dm_help_blocks() -> list[dict]:
+	return [
+		{
+			"type": "header",
+			"text": {
+				"type": "plain_text",
+				"text": "🤖 DM機能ヘルプ（勤怠管理）",
+				"emoji": True
+			}
+		},
+		{
+			"type": "section",
+			"text": {
+				"type": "mrkdwn",
+				"text": "*📋 勤怠管理機能:*\n• `メニュー` - メインメニューを表示\n• `出勤開始` / `しゅっきん` / `start` - 勤務開始時刻を記録\n• `退勤` / `たいきん` / `end` - 勤務終了時刻を記録\n• `出勤更新` / `予定` / `att` - 出勤予定を登録\n• `出勤確認` / `かくにん` / `check` - チーム出勤状況を確認\n• `ユーザー情報` / `プロフィール` / `user` - 個人設定と勤務記録\n• `エクスポート` / `export` - 自分の勤務記録・出勤予定・メモ・タスクを CSV / Parquet で書き出し"
+			}
+		},
+		{
+			"type": "section",
+			"text": {
+				"type": "mrkdwn",
+				"text": "*  DM専用コマンド:*\n• 出勤開始、退勤の記録\n• 火曜日・金曜日の出勤予定管理\n• 個人の勤務時間確認\n• チーム全体の出勤状況確認"
+			}
+		}
+	]
+
+
+def _dm_help(event, body, say, client):
+	say(blocks=_dm_help_blocks())
+
+
+dm_commands = CommandRouter()
+for _name, _handler in (
+	("menu", _dm_menu),
+	("start", _dm_start),
+	("end", _dm_end),
+	("attendance", _dm_attendance),
+	("overview", _dm_overview),
+	("user", _dm_user),
+	("help", _dm_help),
+):
+	dm_commands.add(DM_COMMAND_ALIASES[_name], _handler)
+dm_commands.add(EXPORT_COMMAND_ALIASES, show_export_usage)
+dm_commands.add(EXPORT_COMMAND_ALIASES, export_for_user, with_args=True)
+
+
+message_prefilter = MessagePrefilter(channel_commands, dm_commands)
+
+_listeners_registered = False
+
+
+def register_listeners() -> None:
+	"""メッセージイベントとチャンネル機能のリスナーを bolt_app に登録（2回目以降は何もしない）"""
+	global _listeners_registered
+	if _listeners_registered:
+		return
+	_listeners_registered = True
+
+	# コマンド以外のメッセージはリスナーの照合前に打ち切る
+	bolt_app.use(message_prefilter)
+	# 再送されたイベントを打ち切る（フィルター後に置き、通常の発言で記録を埋めない）
+	bolt_app.use(event_deduplicator)
+
+	@bolt_app.event("message")
+	def handle_unified_message(body, say, logger, client):  # type: ignore[no-redef]
+		"""統一メッセージハンドラー - DM/チャンネルを判定して適切な処理に振り分け"""
+		event = body.get("event", {})
+
+		if event.get("channel_type") == "im":
 			# DM処理
 			handle_dm_logic(event, body, say, client, logger)
 		else:
@@ -82,76 +190,19 @@ def main() -> int:
 
 	def handle_dm_logic(event, body, say, client, logger):
 		"""DM専用処理ロジック"""
-		text = event.get("text", "").strip()
-
-		if text in {"menu", "メニュー", "めにゅー"}:
-			display_menu(say, body=body, client=client)
-		elif text in {"出勤開始", "しゅっきん", "start"}:
-			start_work(say)
-		elif text in {"退勤", "たいきん", "end"}:
-			# ユーザー情報を取得
-			user_slack_id = event.get("user")
-			display_name = None
-			if user_slack_id:
-				try:
-					prof = client.users_profile_get(user=user_slack_id)
-					display_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-				except Exception:
-					pass
-
-			from db.repository import get_or_create_user
-			user = get_or_create_user(user_slack_id or "unknown", display_name)
-			prompt_end_work(say, user_id=user.id)
-		elif text in {"出勤更新", "予定", "att"}:
-			prompt_attendance(say)
-		elif text in {"出勤確認", "かくにん", "check"}:
-			show_attendance_overview(say)
-		elif text in {"ユーザー情報", "プロフィール", "user"}:
-			# fetch display name and pass slack id
-			try:
-				user_slack_id = event.get("user")
-				prof = client.users_profile_get(user=user_slack_id)
-				real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-			except Exception:
-				real_name = None
-			show_or_edit_user(say, real_name, user_slack_id)
-		elif text in {"help", "ヘルプ", "使い方"}:
-			help_blocks = [
-				{
-					"type": "header",
-					"text": {
-						"type": "plain_text",
-						"text": "🤖 DM機能ヘルプ（勤怠管理）",
-						"emoji": True
-					}
-				},
-				{
-					"type": "section",
-					"text": {
-						"type": "mrkdwn",
-						"text": "*📋 勤怠管理機能:*\n• `メニュー` - メインメニューを表示\n• `出勤開始` / `しゅっきん` / `start` - 勤務開始時刻を記録\n• `退勤` / `たいきん` / `end` - 勤務終了時刻を記録\n• `出勤更新` / `予定` / `att` - 出勤予定を登録\n• `出勤確認` / `かくにん` / `check` - チーム出勤状況を確認\n• `ユーザー情報` / `プロフィール` / `user` - 個人設定と勤務記録"
-					}
-				},
-				{
-					"type": "section",
-					"text": {
-						"type": "mrkdwn",
-						"text": "*  DM専用コマンド:*\n• 出勤開始、退勤の記録\n• 火曜日・金曜日の出勤予定管理\n• 個人の勤務時間確認\n• チーム全体の出勤状況確認"
-					}
-				}
-			]
-			say(blocks=help_blocks)
+		route = dm_commands.resolve(event.get("text", ""))
+		if route is not None:
+			handler, args = route
+			if args:
+				# 引数は with_args=True で登録したコマンドにだけ渡る
+				handler(event, body, say, client, args)
+			else:
+				handler(event, body, say, client)
 
 	def handle_channel_logic(event, body, say, client, logger):
 		"""チャンネル専用処理ロジック"""
-		text = event.get("text", "").strip()
-		channel_id = event.get("channel")
-		user_id = event.get("user")
-
-
 		try:
 			# チャンネル機能を直接処理
-			from handlers.channel.handlers import handle_channel_message
 			handle_channel_message(event, body, say, client, logger)
 
 		except Exception as e:
@@ -160,15 +211,18 @@ def main() -> int:
 	# チャンネル機能のアクションハンドラーのみ登録（メッセージハンドラーは統一ハンドラーを使用）
 	register_channel_handlers(bolt_app)
 
-	# DEBUG: 全イベントをキャッチするハンドラー（デバッグ用）
-	@bolt_app.event({"type": "message"})
-	def catch_all_messages(body, logger):
-		"""全メッセージイベントをキャッチ（デバッグ用）"""
-		event = body.get("event", {})
-		channel_type = event.get("channel_type", "unknown")
-		text = event.get("text", "")
-		channel_id = event.get("channel", "unknown")
 
+def create_app(start_services: bool = True) -> Flask:
+	"""
+	Flask アプリを生成
+
+	gunicorn などの WSGI サーバーは wsgi.py 経由でワーカーごとに呼び出す。
+	バックグラウンド処理のスレッドは fork を越えて引き継がれないため、ここで開始する。
+	"""
+	_setup_logging()
+	register_listeners()
+	if start_services:
+		start_background_services()
 
 	flask_app = Flask(__name__)
 	handler = SlackRequestHandler(bolt_app)
@@ -176,27 +230,95 @@ def main() -> int:
 	@flask_app.route("/slack/events", methods=["POST"])
 	def slack_events():  # type: ignore[no-redef]
 		try:
-			# Content-Typeをチェック
-			content_type = request.content_type
-
-			# リクエストボディをログ出力（セキュリティ上、一部のみ）
-			request_data = None
-			if content_type and 'application/json' in content_type:
-				request_data = request.get_json()
-				if request_data:
-					event_type = request_data.get("type")
-					event = request_data.get("event", {})
-
-			result = handler.handle(request)
-			return result
+			return handler.handle(request)
 		except Exception as e:
 			return "Internal Server Error", 500
 
 	@flask_app.get("/health")
 	def health():
-		return "ok", 20
+		return "ok", 200
+
+	@flask_app.get("/metrics")
+	def metrics():
+		# アクション実行キューの状況
+		return jsonify({"actions": action_executor.stats(), "exports": export_executor.stats(), "messages": message_prefilter.stats(), "events": event_deduplicator.stats(), "db_cache": repository_cache.stats()})
+
+	return flask_app
+
+
+def _with_backoff(connect, base: float, cap: float, logger: logging.Logger):
+	"""接続関数を指数バックオフ（ジッター付き）で再試行するようにラップ"""
+	def wrapped(*args, **kwargs):
+		failures = 0
+		while True:
+			try:
+				return connect(*args, **kwargs)
+			except Exception as e:
+				delay = min(cap, base * (2 ** failures)) * random.uniform(0.5, 1.0)
+				failures += 1
+				logger.warning(f"Socket Mode の接続に失敗しました（{failures}回目、{delay:.1f}秒後に再試行）: {e}")
+				time.sleep(delay)
+	return wrapped
+
+
+def run_socket_mode(logger: logging.Logger) -> int:
+	"""Socket Mode で起動（公開エンドポイント不要）"""
+	from slack_bolt.adapter.socket_mode import SocketModeHandler
+
+	app_token = _get_env("SLACK_APP_TOKEN")
+	if not app_token:
+		logger.error("SLACK_MODE=socket には SLACK_APP_TOKEN（xapp-）が必要です")
+		return 1
+
+	register_listeners()
+	start_background_services()
+
+	socket_handler = SocketModeHandler(
+		bolt_app,
+		app_token,
+		concurrency=int(os.getenv("SOCKET_MODE_CONCURRENCY", "10")),
+		ping_interval=float(os.getenv("SOCKET_MODE_PING_INTERVAL", "10")),
+	)
+	# 再接続（組み込みクライアントの監視スレッドから呼ばれる）と初回接続にバックオフを掛ける
+	client = socket_handler.client
+	client.connect_to_new_endpoint = _with_backoff(
+		client.connect_to_new_endpoint,
+		base=float(os.getenv("SOCKET_MODE_BACKOFF_BASE", "1")),
+		cap=float(os.getenv("SOCKET_MODE_BACKOFF_MAX", "60")),
+		logger=logger,
+	)
+	client.connect_to_new_endpoint()
+	logger.info("Socket Mode で接続しました")
+	threading.Event().wait()
+	return 0
+
+
+def main() -> int:
+	# .env を読み込む（存在しない場合は無視）
+	_setup_logging()
+	logger = logging.getLogger("hitechlab-assistant")
+
+
+	# Slack APIの権限をテスト
+	try:
+		from boltApp import bolt_app
+
+		# auth.test を実行して基本権限を確認
+		auth_response = bolt_app.client.auth_test()
+
+		# botのスコープを確認
+		try:
+			scopes_response = bolt_app.client.auth_test()
+		except Exception as scope_error:
+			logger.error(f"Slack APIのスコープ確認に失敗しました: {str(scope_error)}")
+
+	except Exception as e:
+		logger.error(f"Slack APIの認証に失敗しました: {str(e)}")
 
+	if (_get_env("SLACK_MODE") or "http").lower() == "socket":
+		return run_socket_mode(logger)
 
+	flask_app = create_app()
 	port = int(os.getenv("PORT", "3001"))
 	flask_app.run(host="0.0.0.0", port=port)
 	return 0
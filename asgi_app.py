@@ -0,0 +1,105 @@
+"""
+asyncio サーバーモード（ASGI）
+
+    uvicorn asgi_app:api --host 0.0.0.0 --port 3001
+
+AsyncApp を ASGI で公開し、チャンネルメッセージ（メニュー・メモ/タスク作成・メモ一覧）は
+AsyncWebClient と非同期 Supabase クライアントでイベントループ上で処理する。
+それ以外のイベント・アクション・モーダルは既存の同期 bolt_app に委譲する
+（同期側のアクションは ack 後にバックグラウンド実行されるため、スレッドを長く占有しない）。
+"""
+
+import asyncio
+import json
+import logging
+
+from slack_bolt import BoltRequest, BoltResponse
+from slack_bolt.adapter.asgi.async_handler import AsyncSlackRequestHandler
+from slack_bolt.adapter.asgi.http_response import AsgiHttpResponse
+from slack_bolt.async_app import AsyncApp
+
+from app import _setup_logging, message_prefilter, register_listeners, start_background_services
+from boltApp import bolt_app, bot_token, signing_secret
+from handlers.background import action_executor, export_executor
+from db.read_cache import repository_cache
+from handlers.event_dedup import event_deduplicator
+from handlers.event_filter import PREFILTER_PASSED
+from handlers.channel.async_handlers import handle_channel_message_async
+
+_setup_logging()
+logger = logging.getLogger("hitechlab-assistant")
+
+async_app = AsyncApp(token=bot_token, signing_secret=signing_secret)
+register_listeners()
+
+_counters = {"native": 0, "delegated": 0}
+
+
+def _is_native(body: dict) -> bool:
+	"""イベントループ上で処理するリクエストか（事前フィルターを通過したチャンネルのメッセージ）"""
+	event = body.get("event") or {}
+	return (
+		body.get("type") == "event_callback"
+		and event.get("type") == "message"
+		and event.get("channel_type") != "im"
+		and not event.get("subtype")
+		and not event.get("bot_id")
+	)
+
+
+@async_app.middleware
+async def delegate_to_sync_app(req, resp, next):
+	"""非同期化していないリクエストは同期 bolt_app でそのまま処理する"""
+	if not message_prefilter.should_dispatch(req.body):
+		return BoltResponse(status=200, body="")
+	if _is_native(req.body):
+		if not event_deduplicator.is_first_delivery(req.body):
+			return BoltResponse(status=200, body="")
+		_counters["native"] += 1
+		return await next()
+
+	_counters["delegated"] += 1
+	sync_req = BoltRequest(
+		body=req.raw_body,
+		query=req.query,
+		headers=req.headers,
+		context={PREFILTER_PASSED: True},
+		mode=req.mode,
+	)
+	return await asyncio.to_thread(bolt_app.dispatch, sync_req)
+
+
+@async_app.event("message")
+async def handle_channel_message(event, say, client, logger):
+	try:
+		await handle_channel_message_async(event, say, client, logger)
+	except Exception as e:
+		await say(text=f"❌ チャンネル処理中にエラーが発生しました: {str(e)}")
+
+
+class AppRequestHandler(AsyncSlackRequestHandler):
+	"""/slack/events に加えて /health・/metrics を返し、起動時にバックグラウンド処理を開始"""
+
+	async def _get_http_response(self, method, path, request):
+		if method == "GET" and path == "/health":
+			return AsgiHttpResponse(status=200, headers={"content-type": ["text/plain;charset=utf-8"]}, body="ok")
+		if method == "GET" and path == "/metrics":
+			metrics = {
+				"actions": action_executor.stats(),
+				"exports": export_executor.stats(),
+				"requests": dict(_counters),
+				"messages": message_prefilter.stats(),
+				"events": event_deduplicator.stats(),
+				"db_cache": repository_cache.stats(),
+			}
+			return AsgiHttpResponse(status=200, headers={"content-type": ["application/json"]}, body=json.dumps(metrics))
+		return await super()._get_http_response(method, path, request)
+
+	async def _handle_lifespan(self, receive):
+		message = await super()._handle_lifespan(receive)
+		if message["type"] == "lifespan.startup.complete":
+			start_background_services()
+		return message
+
+
+api = AppRequestHandler(async_app)
@@ -0,0 +1,114 @@
+"""
+asyncio サーバーモード用のリポジトリ関数
+
+repository.py の同名関数と同じ引数・戻り値で、非同期 Supabase クライアントを使う。
+イベントループを塞がないよう、チャンネルメッセージの処理で使うものだけを用意している。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .memo_index import memo_search_index
+from .read_cache import MISSING, repository_cache
+from .repository import (
+    MEMO_LIST_COLUMNS,
+    MEMO_PAGE_SIZE,
+    _invalidate_memo_stats,
+    _keyset_query,
+    _keyset_result,
+    is_unique_violation,
+    normalize_timestamps,
+)
+from .supabase_client import get_async_client, to_record
+
+
+async def save_channel_memo(memo_data: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """
+    チャンネルメッセージをメモとして保存
+
+    Args:
+        memo_data: メモデータ辞書
+
+    Returns:
+        保存されたメモデータ、失敗時はNone
+    """
+    try:
+        sb = await get_async_client()
+        res = await sb.table("channel_memos").insert(memo_data).execute()
+        data = to_record(res)
+        if data:
+            _invalidate_memo_stats(data)
+            repository_cache.invalidate_rows("channel_memos", data)
+            memo_search_index.on_insert(data[0])
+        return data[0] if data else None
+    except Exception as e:
+        if is_unique_violation(e):
+            # 同じメッセージの再送。保存済みのメモを返す
+            return await _get_channel_memo_by_message_ts(memo_data.get("channel_id"), memo_data.get("message_ts"))
+        return None
+
+
+async def _get_channel_memo_by_message_ts(channel_id: Optional[str], message_ts: Optional[str]) -> Optional[dict[str, Any]]:
+    if not channel_id or not message_ts:
+        return None
+    try:
+        sb = await get_async_client()
+        res = await (
+            sb.table("channel_memos").select("*").eq("channel_id", channel_id).eq("message_ts", message_ts).limit(1).execute()
+        )
+        data = to_record(res) or []
+        return data[0] if data else None
+    except Exception as e:
+        return None
+
+
+async def save_channel_task(task_data: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """
+    チャンネルタスクを保存
+
+    Args:
+        task_data: タスクデータ辞書
+
+    Returns:
+        保存されたタスクデータ、失敗時はNone
+    """
+    try:
+        sb = await get_async_client()
+        res = await sb.table("channel_tasks").insert(task_data).execute()
+        data = to_record(res)
+        if data:
+            repository_cache.invalidate_rows("channel_tasks", data)
+        return data[0] if data else None
+    except Exception as e:
+        return None
+
+
+async def get_channel_memos_page(
+    channel_id: str,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    limit: int = MEMO_PAGE_SIZE
+) -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    チャンネルのメモを1ページ分取得（一覧表示用）
+
+    Returns:
+        (メモリスト（新しい順）, 次ページのカーソル, 前ページのカーソル)
+    """
+    # 同期版と同じキーでキャッシュを共有する
+    key = repository_cache.key("channel_memos", channel_id, ("page", cursor, direction, limit))
+    cached = repository_cache.lookup(key)
+    if cached is not MISSING:
+        return cached
+    try:
+        sb = await get_async_client()
+        query = sb.table("channel_memos").select(MEMO_LIST_COLUMNS).eq("channel_id", channel_id)
+        rows = to_record(await _keyset_query(query, limit, cursor, direction).execute()) or []
+        rows, next_cursor, prev_cursor = _keyset_result(rows, limit, cursor, direction)
+        result = normalize_timestamps(rows), next_cursor, prev_cursor
+        repository_cache.store(key, result)
+        return result
+
+    except Exception as e:
+        return [], None, None
@@ -0,0 +1,275 @@
+"""
+テーブルのエクスポート（CSV / Parquet）
+
+works・attendance・channel_memos・channel_tasks を range 指定のページングで読み出し、
+1ページずつファイルへ書き出す（メモリ使用量は件数に依存しない）。
+日付範囲（JST、両端を含む）とユーザーで絞り込める。
+
+    python -m db.export works --from 2024-01-01 --to 2024-01-31 -o works.csv
+    python -m db.export channel_memos --format parquet -o memos.parquet
+
+Parquet は任意の依存関係（pip install pyarrow）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import importlib.util
+import io
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import IO, Any, Iterator, Optional
+
+from .supabase_client import get_client, to_record
+from .timeutil import JST, parse_timestamp
+
+EXPORT_PAGE_SIZE = 1000
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def parquet_available() -> bool:
+    """Parquet の書き出しに必要な pyarrow がインストールされているか"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """エクスポート対象テーブルの列（列名, 型）と絞り込みに使う列"""
+    table: str
+    columns: tuple[tuple[str, str], ...]
+    # 日付範囲で絞り込む timestamptz 列（None なら year/month/day 列で絞り込む）
+    time_column: Optional[str]
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _ in self.columns]
+
+
+EXPORT_SPECS: dict[str, ExportSpec] = {
+    spec.table: spec
+    for spec in (
+        ExportSpec(
+            "works",
+            (
+                ("id", "string"), ("user_id", "string"), ("start_time", "timestamp"),
+                ("end_time", "timestamp"), ("break_time", "int"), ("comment", "string"),
+                ("created_at", "timestamp"), ("updated_at", "timestamp"),
+            ),
+            "start_time",
+        ),
+        ExportSpec(
+            "attendance",
+            (
+                ("id", "string"), ("user_id", "string"), ("year", "int"), ("month", "int"),
+                ("day", "int"), ("is_attend", "bool"), ("start_time", "string"),
+                ("created_at", "timestamp"), ("updated_at", "timestamp"),
+            ),
+            None,
+        ),
+        ExportSpec(
+            "channel_memos",
+            (
+                ("id", "string"), ("channel_id", "string"), ("channel_name", "string"),
+                ("user_id", "string"), ("user_name", "string"), ("message", "string"),
+                ("message_ts", "string"), ("thread_ts", "string"), ("permalink", "string"),
+                ("created_at", "timestamp"), ("updated_at", "timestamp"),
+            ),
+            "created_at",
+        ),
+        ExportSpec(
+            "channel_tasks",
+            (
+                ("id", "string"), ("channel_id", "string"), ("channel_name", "string"),
+                ("user_id", "string"), ("user_name", "string"), ("task_name", "string"),
+                ("description", "string"), ("status", "string"), ("created_at", "timestamp"),
+                ("updated_at", "timestamp"), ("completed_at", "timestamp"),
+            ),
+            "created_at",
+        ),
+    )
+}
+
+
+def _jst_day_start(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day, tzinfo=JST)
+
+
+def _date_bound(d: date, op: str) -> str:
+    """(year, month, day) >= d（op="gt"）または <= d（op="lt"）を表す or 条件の中身"""
+    return (
+        f"year.{op}.{d.year},"
+        f"and(year.eq.{d.year},month.{op}.{d.month}),"
+        f"and(year.eq.{d.year},month.eq.{d.month},day.{op}e.{d.day})"
+    )
+
+
+def _build_query(
+    spec: ExportSpec,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    user_id: Optional[str]
+) -> Any:
+    query = get_client().table(spec.table).select(", ".join(spec.column_names))
+    if user_id:
+        query = query.eq("user_id", user_id)
+
+    if spec.time_column:
+        if date_from:
+            query = query.gte(spec.time_column, _jst_day_start(date_from).isoformat())
+        if date_to:
+            query = query.lt(spec.time_column, _jst_day_start(date_to + timedelta(days=1)).isoformat())
+        return query.order(spec.time_column).order("id")
+
+    # attendance は (year, month, day) の辞書順で範囲を指定する
+    if date_from and date_to:
+        query = query.or_(f"and(or({_date_bound(date_from, 'gt')}),or({_date_bound(date_to, 'lt')}))")
+    elif date_from:
+        query = query.or_(_date_bound(date_from, "gt"))
+    elif date_to:
+        query = query.or_(_date_bound(date_to, "lt"))
+    return query.order("year").order("month").order("day").order("id")
+
+
+def iter_export_pages(
+    table: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    user_id: Optional[str] = None,
+    page_size: int = EXPORT_PAGE_SIZE
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    テーブルを (日時, id) 順に1ページずつ返す
+
+    Args:
+        table: EXPORT_SPECS のテーブル名
+        date_from / date_to: JST の日付範囲（両端を含む、None なら制限なし）
+        user_id: 指定時はその user_id の行のみ（works/attendance は users.id、メモ/タスクは Slack ユーザーID）
+        page_size: 1回の取得件数
+    """
+    spec = EXPORT_SPECS[table]
+    offset = 0
+    while True:
+        query = _build_query(spec, date_from, date_to, user_id)
+        rows = to_record(query.range(offset, offset + page_size - 1).execute()) or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        offset += page_size
+
+
+class CsvExportWriter:
+    """ヘッダー付きの CSV を1ページずつ書き出す"""
+
+    def __init__(self, stream: IO[str], spec: ExportSpec):
+        self._columns = spec.column_names
+        self._writer = csv.writer(stream)
+        self._writer.writerow(self._columns)
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._writer.writerows([row.get(name) for name in self._columns] for row in rows)
+
+    def close(self) -> None:
+        pass
+
+
+class ParquetExportWriter:
+    """1ページを1行グループとして Parquet を書き出す（列の型は ExportSpec から決める）"""
+
+    def __init__(self, stream: IO[bytes], spec: ExportSpec):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet の書き出しには pyarrow が必要です（pip install pyarrow）")
+
+        types = {
+            "string": pa.string(),
+            "int": pa.int64(),
+            "bool": pa.bool_(),
+            "timestamp": pa.timestamp("us", tz="UTC"),
+        }
+        self._pa = pa
+        self._spec = spec
+        self._schema = pa.schema([(name, types[kind]) for name, kind in spec.columns])
+        self._writer = pq.ParquetWriter(stream, self._schema)
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        arrays = []
+        for name, kind in self._spec.columns:
+            values = [row.get(name) for row in rows]
+            if kind == "timestamp":
+                values = [parse_timestamp(v) for v in values]
+            arrays.append(self._pa.array(values, type=self._schema.field(name).type))
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def export_table(
+    table: str,
+    stream: IO[bytes],
+    fmt: str = "csv",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    user_id: Optional[str] = None
+) -> int:
+    """
+    テーブルを CSV（UTF-8 BOM 付き）または Parquet でバイナリストリームに書き出す
+
+    Returns:
+        書き出した行数
+    """
+    if table not in EXPORT_SPECS:
+        raise ValueError(f"Unknown export table: {table}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    spec = EXPORT_SPECS[table]
+    text = None
+    if fmt == "csv":
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="", write_through=True)
+        writer: Any = CsvExportWriter(text, spec)
+    else:
+        writer = ParquetExportWriter(stream, spec)
+
+    count = 0
+    try:
+        for rows in iter_export_pages(table, date_from, date_to, user_id):
+            writer.write(rows)
+            count += len(rows)
+    finally:
+        writer.close()
+        if text is not None:
+            # 呼び出し側のストリームは閉じない
+            text.detach()
+    return count
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m db.export", description="Supabase のテーブルを CSV / Parquet に書き出す")
+    parser.add_argument("table", choices=sorted(EXPORT_SPECS))
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="開始日（JST, YYYY-MM-DD）")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="終了日（JST, YYYY-MM-DD、この日を含む）")
+    parser.add_argument("--user", dest="user_id", help="user_id で絞り込み")
+    parser.add_argument("-o", "--output", help="出力ファイル（省略時は標準出力）")
+    args = parser.parse_args(argv)
+    if args.format == "parquet" and not parquet_available():
+        parser.error("Parquet の書き出しには pyarrow が必要です（pip install pyarrow）")
+
+    if args.output:
+        with open(args.output, "wb") as stream:
+            count = export_table(args.table, stream, args.format, args.date_from, args.date_to, args.user_id)
+    else:
+        count = export_table(args.table, sys.stdout.buffer, args.format, args.date_from, args.date_to, args.user_id)
+        sys.stdout.buffer.flush()
+    print(f"{count} rows exported", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
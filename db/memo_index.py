@@ -0,0 +1,265 @@
+"""
+チャンネルメモのプロセス内 n-gram 転置インデックス
+
+日本語は空白で分かち書きされないため、channel_memos.message を文字 bigram で
+索引付けし、部分一致検索を DB に問い合わせずに処理する。
+ポスティングリストは array('I') に昇順のローカル文書番号を追記する。
+更新・削除は墓標（tombstone）で表し、一定割合を超えたらチャンネル単位で詰め直す。
+
+索引は起動時に1回構築し、以降はこのプロセスでの書き込みでのみ更新する
+（MEMO_SEARCH_INDEX=true で有効にした場合のみ）。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import unicodedata
+from array import array
+from typing import Any, Iterable, Optional
+
+from .supabase_client import get_client, to_record
+
+logger = logging.getLogger(__name__)
+
+BUILD_PAGE_SIZE = 1000
+NGRAM = 2
+COMPACT_RATIO = 0.25
+
+
+def normalize_text(text: str) -> str:
+    """全角/半角・大文字/小文字の違いを吸収"""
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+def _ngrams(text: str) -> set[str]:
+    if len(text) < NGRAM:
+        return set()
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def parse_query(keyword: str) -> list[tuple[list[str], list[str]]]:
+    """
+    検索語を OR グループのリストに分解
+
+    空白区切りで AND、`or` で OR、`"..."` でフレーズ、`-語` で除外。
+    各グループは (含む語のリスト, 除外語のリスト)。
+    """
+    tokens: list[tuple[str, bool]] = []  # (語, フレーズか)
+    buf: list[str] = []
+    in_quote = False
+    for ch in keyword:
+        if ch == '"':
+            if in_quote:
+                tokens.append(("".join(buf), True))
+                buf = []
+            elif buf:
+                tokens.append(("".join(buf), False))
+                buf = []
+            in_quote = not in_quote
+        elif ch.isspace() and not in_quote:
+            if buf:
+                tokens.append(("".join(buf), False))
+                buf = []
+        else:
+            buf.append(ch)
+    if buf:
+        tokens.append(("".join(buf), in_quote))
+
+    groups: list[tuple[list[str], list[str]]] = [([], [])]
+    for token, is_phrase in tokens:
+        if not is_phrase and token.lower() == "or":
+            groups.append(([], []))
+            continue
+        if not is_phrase and token.startswith("-") and len(token) > 1:
+            groups[-1][1].append(normalize_text(token[1:]))
+        else:
+            term = normalize_text(token)
+            if term:
+                groups[-1][0].append(term)
+    return [g for g in groups if g[0]]
+
+
+class ChannelMemoIndex:
+    """1チャンネル分の転置インデックス"""
+
+    def __init__(self):
+        self.rows: list[Optional[dict[str, Any]]] = []  # ローカル文書番号 -> メモ行（削除済みはNone）
+        self.texts: list[str] = []                       # ローカル文書番号 -> 正規化済み本文
+        self.postings: dict[str, array] = {}
+        self.by_id: dict[str, int] = {}
+        self.dead = 0
+
+    def add(self, row: dict[str, Any]) -> None:
+        memo_id = str(row.get("id"))
+        if memo_id in self.by_id:
+            self.remove(memo_id)
+        doc = len(self.rows)
+        text = normalize_text(row.get("message", ""))
+        self.rows.append(row)
+        self.texts.append(text)
+        self.by_id[memo_id] = doc
+        for gram in _ngrams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(doc)
+
+    def remove(self, memo_id: str) -> None:
+        doc = self.by_id.pop(str(memo_id), None)
+        if doc is None:
+            return
+        self.rows[doc] = None
+        self.texts[doc] = ""
+        self.dead += 1
+        if self.dead > COMPACT_RATIO * len(self.rows):
+            self.compact()
+
+    def compact(self) -> None:
+        live = [row for row in self.rows if row is not None]
+        self.__init__()
+        for row in live:
+            self.add(row)
+
+    def _candidates(self, term: str) -> Iterable[int]:
+        grams = _ngrams(term)
+        if not grams:
+            # 1文字は全件を走査
+            return range(len(self.rows))
+        lists = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return ()
+            lists.append(posting)
+        lists.sort(key=len)
+        result = set(lists[0])
+        for posting in lists[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+
+    def search(self, groups: list[tuple[list[str], list[str]]], user_id: Optional[str]) -> list[dict[str, Any]]:
+        matched: set[int] = set()
+        for include, exclude in groups:
+            candidates = set(self._candidates(max(include, key=len)))
+            for doc in candidates:
+                text = self.texts[doc]
+                row = self.rows[doc]
+                if row is None or (user_id and row.get("user_id") != user_id):
+                    continue
+                if all(term in text for term in include) and not any(term in text for term in exclude):
+                    matched.add(doc)
+        return [self.rows[doc] for doc in matched]
+
+
+class MemoSearchIndex:
+    """チャンネルごとの ChannelMemoIndex を保持するスレッドセーフな索引"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._channels: dict[str, ChannelMemoIndex] = {}
+        self._ready = False
+        # 構築中に発生した書き込み（構築完了後に再適用する）
+        self._pending: Optional[list[tuple[str, dict[str, Any]]]] = None
+
+    def is_ready(self) -> bool:
+        return self._ready
+
+    def _apply(self, op: str, row: dict[str, Any]) -> None:
+        channel_id = row.get("channel_id")
+        if not channel_id or not row.get("id"):
+            return
+        if op == "delete":
+            index = self._channels.get(channel_id)
+            if index is not None:
+                index.remove(row["id"])
+        else:
+            self._channels.setdefault(channel_id, ChannelMemoIndex()).add(row)
+
+    def _record(self, op: str, row: dict[str, Any]) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((op, row))
+            self._apply(op, row)
+
+    def on_insert(self, row: dict[str, Any]) -> None:
+        self._record("upsert", row)
+
+    def on_update(self, row: dict[str, Any]) -> None:
+        self._record("upsert", row)
+
+    def on_delete(self, row: dict[str, Any]) -> None:
+        self._record("delete", row)
+
+    def search(
+        self,
+        keyword: str,
+        channel_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 10
+    ) -> Optional[list[dict[str, Any]]]:
+        """部分一致検索（新しい順）。索引の構築前はNone"""
+        if not self._ready:
+            return None
+        groups = parse_query(keyword)
+        if not groups:
+            return []
+        with self._lock:
+            if channel_id:
+                index = self._channels.get(channel_id)
+                indexes = [index] if index is not None else []
+            else:
+                indexes = list(self._channels.values())
+            rows = [row for index in indexes for row in index.search(groups, user_id)]
+        rows.sort(key=lambda r: r.get("created_at") or "", reverse=True)
+        return rows[:limit]
+
+    def build(self) -> bool:
+        """channel_memos 全体をページングで走査して索引を作り直す"""
+        from .repository import MEMO_SEARCH_COLUMNS
+
+        channels: dict[str, ChannelMemoIndex] = {}
+        with self._lock:
+            self._pending = []
+        try:
+            sb = get_client()
+            offset = 0
+            while True:
+                res = (
+                    sb.table("channel_memos")
+                    .select(MEMO_SEARCH_COLUMNS)
+                    .order("created_at")
+                    .order("id")
+                    .range(offset, offset + BUILD_PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows = to_record(res) or []
+                for row in rows:
+                    channels.setdefault(row["channel_id"], ChannelMemoIndex()).add(row)
+                if len(rows) < BUILD_PAGE_SIZE:
+                    break
+                offset += BUILD_PAGE_SIZE
+        except Exception as e:
+            logger.warning(f"Memo search index build failed: {e}")
+            with self._lock:
+                self._pending = None
+            return False
+
+        with self._lock:
+            self._channels = channels
+            for op, row in self._pending or []:
+                self._apply(op, row)
+            self._pending = None
+            self._ready = True
+        logger.info(f"Memo search index built: {sum(len(i.by_id) for i in channels.values())} memos")
+        return True
+
+    def build_async(self) -> threading.Thread:
+        thread = threading.Thread(target=self.build, name="memo-index-build", daemon=True)
+        thread.start()
+        return thread
+
+
+memo_search_index = MemoSearchIndex()
@@ -0,0 +1,173 @@
+"""
+全ユーザーの月次給与計算
+
+指定月の works を全ユーザー分まとめてページング取得し、勤務時間（月またぎの切り捨て・
+休憩の比例配分）を NumPy の配列演算で一括計算して users の時給・交通費と突き合わせる。
+計算方法は work_hours.work_row_breakdown と同じ。
+
+    python -m db.payroll 2024 1              # CSV を標準出力へ
+    python -m db.payroll 2024 1 -o payroll.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from datetime import timezone
+from typing import Any, Optional
+
+import numpy as np
+
+from .repository import User, get_users
+from .supabase_client import get_client, to_record
+from .timeutil import parse_timestamp
+from .work_hours import month_range_utc
+
+PAYROLL_PAGE_SIZE = 1000
+PAYROLL_WORK_COLUMNS = "id, user_id, start_time, end_time, break_time_min:break_time"
+PAYROLL_USER_COLUMNS = "id, name, hourly_wage, transportation_cost"
+
+JST_OFFSET_SEC = 9 * 3600
+
+PAYROLL_CSV_COLUMNS = (
+    "user_id", "name", "work_count", "work_days", "work_hours",
+    "hourly_wage", "transportation_cost", "wage", "transportation", "total",
+)
+
+
+def fetch_month_works(year: int, month: int) -> list[dict[str, Any]]:
+    """指定月（JST）に開始された全ユーザーの勤務記録を (start_time, id) 順にページング取得"""
+    utc_start, utc_end = month_range_utc(year, month)
+    sb = get_client()
+    rows: list[dict[str, Any]] = []
+    offset = 0
+    while True:
+        res = (
+            sb.table("works")
+            .select(PAYROLL_WORK_COLUMNS)
+            .gte("start_time", utc_start.isoformat())
+            .lt("start_time", utc_end.isoformat())
+            .order("start_time")
+            .order("id")
+            .range(offset, offset + PAYROLL_PAGE_SIZE - 1)
+            .execute()
+        )
+        page = to_record(res) or []
+        rows.extend(page)
+        if len(page) < PAYROLL_PAGE_SIZE:
+            break
+        offset += PAYROLL_PAGE_SIZE
+    return rows
+
+
+def _epoch_seconds(values: list[Any]) -> "np.ndarray":
+    """ISO 8601 の列を UTC の経過秒に変換（欠損・不正値は NaN）"""
+    naive = []
+    for value in values:
+        if not value:
+            naive.append("NaT")
+        elif value.endswith("+00:00"):
+            naive.append(value[:-6])
+        elif value.endswith("Z"):
+            naive.append(value[:-1])
+        else:
+            dt = parse_timestamp(value)
+            naive.append(dt.astimezone(timezone.utc).replace(tzinfo=None).isoformat() if dt else "NaT")
+    stamps = np.array(naive, dtype="datetime64[us]")
+    seconds = stamps.astype(np.int64) / 1e6
+    seconds[np.isnat(stamps)] = np.nan
+    return seconds
+
+
+def compute_payroll(works: list[dict[str, Any]], users: list[User], year: int, month: int) -> list[dict[str, Any]]:
+    """
+    勤務記録とユーザー一覧から月次の給与を計算
+
+    Args:
+        works: 指定月に開始された勤務記録（user_id, start_time, end_time, break_time_min）
+        users: 対象ユーザー（この順で結果を返す）
+        year, month: 対象年月（JST）
+
+    Returns:
+        ユーザーごとの辞書のリスト
+        （work_count: 終了済みの勤務数, work_days: 勤務日数（JST の開始日）, work_hours,
+          wage: 勤務時間 × 時給（円未満四捨五入）, transportation: 交通費 × 勤務日数, total）
+    """
+    _, month_end = month_range_utc(year, month)
+    index = {user.id: i for i, user in enumerate(users)}
+    rows = [row for row in works if row.get("user_id") in index]
+    n_users = len(users)
+
+    owner = np.fromiter((index[row["user_id"]] for row in rows), dtype=np.int64, count=len(rows))
+    start = _epoch_seconds([row.get("start_time") for row in rows])
+    end = _epoch_seconds([row.get("end_time") for row in rows])
+    break_min = np.fromiter((row.get("break_time_min") or 0 for row in rows), dtype=np.float64, count=len(rows))
+    finished = ~np.isnan(start) & ~np.isnan(end)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 月をまたぐ勤務は月末までで切り、休憩は月内の割合で比例配分
+        work_sec = np.minimum(end, month_end.timestamp()) - start
+        total_sec = end - start
+        ratio = np.where(total_sec > 0, work_sec / total_sec, 0.0)
+        hours = np.where(finished, np.maximum(0.0, (work_sec / 60 - break_min * ratio) / 60), 0.0)
+
+    work_hours = np.bincount(owner, weights=hours, minlength=n_users)
+    work_count = np.bincount(owner[finished], minlength=n_users)
+    day = np.floor((start[finished] + JST_OFFSET_SEC) / 86400).astype(np.int64)
+    user_days = np.unique(np.stack([owner[finished], day]), axis=1)
+    work_days = np.bincount(user_days[0], minlength=n_users)
+
+    hourly_wage = np.array([user.hourly_wage or 0 for user in users], dtype=np.float64)
+    transportation_cost = np.array([user.transportation_cost or 0 for user in users], dtype=np.float64)
+    # 四捨五入（np.rint は偶数丸めのため使わない）。秒からの換算誤差は小数第6位で丸めてから判定
+    wage = np.floor(np.round(work_hours * hourly_wage, 6) + 0.5)
+    transportation = transportation_cost * work_days
+    total = wage + transportation
+
+    return [
+        {
+            "user_id": user.id,
+            "name": user.name,
+            "work_count": int(work_count[i]),
+            "work_days": int(work_days[i]),
+            "work_hours": float(work_hours[i]),
+            "hourly_wage": user.hourly_wage,
+            "transportation_cost": user.transportation_cost,
+            "wage": float(wage[i]),
+            "transportation": float(transportation[i]),
+            "total": float(total[i]),
+        }
+        for i, user in enumerate(users)
+    ]
+
+
+def get_monthly_payroll(year: int, month: int) -> list[dict[str, Any]]:
+    """全ユーザーの指定月の給与を計算（勤務記録・ユーザーの取得はそれぞれ1回のページング/クエリ）"""
+    users = get_users(PAYROLL_USER_COLUMNS)
+    return compute_payroll(fetch_month_works(year, month), users, year, month)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m db.payroll", description="全ユーザーの月次給与を CSV で出力")
+    parser.add_argument("year", type=int)
+    parser.add_argument("month", type=int, choices=range(1, 13), metavar="month")
+    parser.add_argument("-o", "--output", help="出力ファイル（省略時は標準出力）")
+    args = parser.parse_args(argv)
+
+    rows = get_monthly_payroll(args.year, args.month)
+    stream = open(args.output, "w", encoding="utf-8-sig", newline="") if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(stream, fieldnames=PAYROLL_CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if args.output:
+            stream.close()
+    total = sum(row["total"] for row in rows)
+    print(f"{len(rows)} users, total {total:,.0f} yen", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
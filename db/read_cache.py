@@ -0,0 +1,101 @@
+"""
+リポジトリ読み取り結果のプロセス内キャッシュ
+
+一覧表示のたびに同じクエリを発行しないよう、テーブルとスコープ（チャンネルIDなど）ごとに
+クエリ引数をキーとして結果を TTL 付きで保持する。
+書き込み時はそのスコープの世代を進めることで、古い世代のキーを参照しなくなる
+（古いエントリは TTL・LRU で自然に消える）。
+返す値は共有されているため、呼び出し側で変更しないこと。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from cachetools import TTLCache
+
+MISSING = object()
+
+
+class RepositoryReadCache:
+    """テーブル・スコープ単位で無効化できる読み取りキャッシュ"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        # table -> 世代、(table, scope) -> 世代
+        self._table_generations: dict[str, int] = {}
+        self._scope_generations: dict[tuple[str, Hashable], int] = {}
+        self._counters = {"hit": 0, "miss": 0, "invalidated": 0}
+
+    def key(self, table: str, scope: Hashable, params: Hashable) -> tuple:
+        """現在の世代を含むキャッシュキー（読み込み開始前に取得しておく）"""
+        with self._lock:
+            return (
+                table,
+                self._table_generations.get(table, 0),
+                scope,
+                self._scope_generations.get((table, scope), 0),
+                params,
+            )
+
+    def lookup(self, key: tuple) -> Any:
+        """キャッシュ済みの値、なければ MISSING"""
+        with self._lock:
+            value = self._cache.get(key, MISSING)
+            self._counters["miss" if value is MISSING else "hit"] += 1
+            return value
+
+    def store(self, key: tuple, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def get(self, table: str, scope: Hashable, params: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        キャッシュから取得し、なければ loader で取得して保存
+
+        loader が例外を送出した場合は保存せずにそのまま送出する。
+        """
+        key = self.key(table, scope, params)
+        value = self.lookup(key)
+        if value is MISSING:
+            value = loader()
+            self.store(key, value)
+        return value
+
+    def invalidate(self, table: str, scope: Optional[Hashable] = None) -> None:
+        """scope を指定すればそのスコープのみ、省略すればテーブル全体を無効化"""
+        with self._lock:
+            if scope is None:
+                self._table_generations[table] = self._table_generations.get(table, 0) + 1
+            else:
+                self._scope_generations[(table, scope)] = self._scope_generations.get((table, scope), 0) + 1
+            self._counters["invalidated"] += 1
+
+    def invalidate_rows(self, table: str, rows: list[dict[str, Any]], scope_field: str = "channel_id") -> None:
+        """書き込みで返された行のスコープを無効化（スコープが分からなければテーブル全体）"""
+        scopes = {row.get(scope_field) for row in rows}
+        if None in scopes:
+            self.invalidate(table)
+            return
+        for scope in scopes:
+            self.invalidate(table, scope)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._counters, "entries": len(self._cache)}
+
+
+# DB の内容を保持するプロセス内キャッシュ（読み取りキャッシュ・メモ統計・月別勤務時間）共通の TTL
+PROCESS_CACHE_TTL = float(os.getenv("PROCESS_CACHE_TTL", "30"))
+
+repository_cache = RepositoryReadCache(
+    maxsize=int(os.getenv("DB_READ_CACHE_SIZE", "1024")),
+    ttl=PROCESS_CACHE_TTL,
+)
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import logging
+import os
+import re
+import threading
 from dataclasses import dataclass
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from typing import Any, Optional
 
-from .supabase_client import get_client, to_record
+from cachetools import TTLCache
 
+from .memo_index import memo_search_index
+from .read_cache import PROCESS_CACHE_TTL, repository_cache
+from .work_hours import work_hours_store
+from .supabase_client import get_client, to_record
+from .timeutil import JST, parse_timestamp
 
-JST = timezone(timedelta(hours=9))
+logger = logging.getLogger(__name__)
 
 
 def utc_now() -> datetime:
@@ -20,6 +29,35 @@ def ymd_from_jst(dt_utc: datetime) -> tuple[int, int, int]:
     return jst_dt.year, jst_dt.month, jst_dt.day
 
 
+def normalize_timestamps(rows: list[dict[str, Any]], fields: tuple[str, ...] = ("created_at",)) -> list[dict[str, Any]]:
+    """
+    結果セットの日時列をまとめて JST の datetime に変換した行のコピーを返す
+
+    行はキャッシュや索引と共有されている場合があるため、元の辞書は変更しない。
+    """
+    normalized = []
+    for row in rows:
+        row = dict(row)
+        for field in fields:
+            if field in row:
+                row[field] = parse_timestamp(row[field])
+        normalized.append(row)
+    return normalized
+
+
+# ===== 取得列 =====
+# 一覧・描画で使う列のみを取得し、転送量とJSONデコード量を減らす
+
+USER_NAME_COLUMNS = "id, name"
+ATTENDANCE_OVERVIEW_COLUMNS = "user_id, year, month, day, is_attend, start_time"
+# works.break_time は時間計算側で break_time_min として扱う
+WORK_HOURS_COLUMNS = "id, start_time, end_time, break_time_min:break_time"
+MEMO_LIST_COLUMNS = "id, user_id, user_name, message, permalink, created_at"
+MEMO_SEARCH_COLUMNS = "id, channel_id, user_id, user_name, message, permalink, created_at"
+MEMO_RECENT_COLUMNS = "id, user_id, user_name, message, created_at"
+TASK_LIST_COLUMNS = "id, user_id, task_name, description, status, created_at"
+
+
 @dataclass
 class User:
     id: str
@@ -71,6 +109,8 @@ def start_work(user_id: str, start_ts_utc: datetime, comment: str | None = None)
     }
     res = sb.table("works").insert(payload).execute()
     items = to_record(res) or []
+    if items:
+        work_hours_store.on_upsert(items[0])
     return items[0] if items else payload
 
 
@@ -97,6 +137,7 @@ def end_work(user_id: str, end_ts_utc: datetime, break_time_min: int | None = No
         return None
     work_id = rows[0]["id"]
 
+    # updated_at は trg_works_updated_at で DB の時刻が入る
     payload: dict[str, Any] = {"end_time": end_ts_utc.isoformat()}
     if break_time_min is not None:
         payload["break_time"] = break_time_min
@@ -105,6 +146,8 @@ def end_work(user_id: str, end_ts_utc: datetime, break_time_min: int | None = No
 
     res2 = sb.table("works").update(payload).eq("id", work_id).execute()
     items2 = to_record(res2) or []
+    if items2:
+        work_hours_store.on_upsert(items2[0])
     return items2[0] if items2 else {"id": work_id, **payload}
 
 
@@ -149,48 +192,84 @@ def upsert_attendance(user_id: str, date_utc: datetime, is_attend: bool, start_t
     if is_attend and start_time:
         payload["start_time"] = start_time
 
-    # upsert by unique constraint
+    # upsert by unique constraint（更新時の updated_at は trg_attendance_updated_at で付く）
     res = sb.table("attendance").upsert(payload, on_conflict="user_id,year,month,day").execute()
     items = to_record(res) or []
     return items[0] if items else payload
 
 
-def get_users() -> list[User]:
+def get_users(columns: str = "*") -> list[User]:
     sb = get_client()
-    res = sb.table("users").select("*").order("name").execute()
+    res = sb.table("users").select(columns).order("name").execute()
     data = to_record(res) or []
     return [User(**row) for row in data]
 
 
-def get_attendance_between_tue_fri(from_utc: datetime, months_ahead: int = 1) -> list[dict[str, Any]]:
-    # Collect dates of Tue/Fri from today to +months_ahead (JST-based days) and query per day
+ATTENDANCE_WEEKDAYS = (1, 4)  # Tue=1, Fri=4
+ATTENDANCE_HORIZON_DAYS = 30
+
+
+def attendance_target_dates(
+    from_utc: datetime,
+    weekdays: tuple[int, ...] = ATTENDANCE_WEEKDAYS,
+    days: int = ATTENDANCE_HORIZON_DAYS,
+) -> list[date]:
+    """from_utc（JST基準の日付）から days 日先までの対象曜日の日付を返す"""
+    start = from_utc.astimezone(JST).date()
+    targets = (start + timedelta(days=i) for i in range(days + 1))
+    return [d for d in targets if d.weekday() in weekdays]
+
+
+def get_attendance_for_dates(target_dates: list[date]) -> list[dict[str, Any]]:
+    """
+    指定日付の出勤予定を1回のクエリで取得
+
+    (year, month) ごとに day の IN 条件をまとめ、or フィルタで結合する。
+    idx_attendance_date (year, month, day) をそのまま利用できる。
+
+    Returns:
+        出勤予定リスト（各行に _year, _month, _day を付与）
+    """
+    if not target_dates:
+        return []
+
+    days_by_month: dict[tuple[int, int], list[int]] = {}
+    for d in target_dates:
+        days_by_month.setdefault((d.year, d.month), []).append(d.day)
+
+    conditions = [
+        f"and(year.eq.{y},month.eq.{m},day.in.({','.join(str(d) for d in sorted(ds))}))"
+        for (y, m), ds in sorted(days_by_month.items())
+    ]
+
     sb = get_client()
+    res = sb.table("attendance").select(ATTENDANCE_OVERVIEW_COLUMNS).or_(",".join(conditions)).execute()
+    rows = to_record(res) or []
+
+    wanted = {(d.year, d.month, d.day) for d in target_dates}
     result: list[dict[str, Any]] = []
+    for r in rows:
+        key = (r["year"], r["month"], r["day"])
+        if key in wanted:
+            r["_year"], r["_month"], r["_day"] = key
+            result.append(r)
+    return result
 
-    # 1 month ahead as 30 days window
-    end_limit = from_utc + timedelta(days=30)
-
-    cur = from_utc
-    while cur <= end_limit:
-        # JST weekday
-        jst = cur.astimezone(JST)
-        if jst.weekday() in (1, 4):  # Tue=1, Fri=4
-            y, m, d = jst.year, jst.month, jst.day
-            res = (
-                sb.table("attendance")
-                .select("*")
-                .eq("year", y)
-                .eq("month", m)
-                .eq("day", d)
-                .execute()
-            )
-            day_rows = to_record(res) or []
-            for r in day_rows:
-                r["_year"], r["_month"], r["_day"] = y, m, d
-                result.append(r)
-        cur += timedelta(days=1)
 
-    return result
+def get_attendance_between(
+    from_utc: datetime,
+    weekdays: tuple[int, ...] = ATTENDANCE_WEEKDAYS,
+    days: int = ATTENDANCE_HORIZON_DAYS,
+) -> tuple[list[date], list[dict[str, Any]]]:
+    """対象曜日の日付一覧と、その期間の出勤予定をまとめて取得"""
+    target_dates = attendance_target_dates(from_utc, weekdays, days)
+    return target_dates, get_attendance_for_dates(target_dates)
+
+
+def get_attendance_between_tue_fri(from_utc: datetime, months_ahead: int = 1) -> list[dict[str, Any]]:
+    # 1 month ahead as 30 days window (Tue/Fri)
+    _, rows = get_attendance_between(from_utc, ATTENDANCE_WEEKDAYS, ATTENDANCE_HORIZON_DAYS * months_ahead)
+    return rows
 
 
 def has_active_work(user_id: str, now_utc: datetime) -> bool:
@@ -216,61 +295,32 @@ def has_active_work(user_id: str, now_utc: datetime) -> bool:
 
 
 def get_work_hours_by_month(user_id: str, year: int, month: int) -> tuple[list[dict[str, Any]], float]:
-    """指定された年月の勤務記録と合計時間を取得（月をまたぐ場合も考慮、未終了も含む）"""
-    sb = get_client()
+    """
+    指定された年月の勤務記録と合計時間を取得（月をまたぐ場合も考慮、未終了も含む）
 
-    # JST での月の範囲を計算
-    jst_start = datetime(year, month, 1, tzinfo=JST)
-    if month == 12:
-        jst_end = datetime(year + 1, 1, 1, tzinfo=JST)
-    else:
-        jst_end = datetime(year, month + 1, 1, tzinfo=JST)
+    勤務記録には work_row_breakdown の内訳（start_dt, end_dt, work_hours, crosses_month）が付く。
+    集計は work_hours_store に保持され、書き込み時に更新される。
+    """
+    summary = work_hours_store.get(
+        user_id, year, month,
+        lambda utc_start, utc_end: _get_works_started_between(user_id, utc_start, utc_end)
+    )
+    return summary.rows, summary.total_hours
 
-    # UTCに変換
-    utc_start = jst_start.astimezone(timezone.utc)
-    utc_end = jst_end.astimezone(timezone.utc)
 
-    # 指定月に開始された勤務記録を取得（終了済み・未終了問わず）
+def _get_works_started_between(user_id: str, utc_start: datetime, utc_end: datetime) -> list[dict[str, Any]]:
+    """指定期間に開始された勤務記録を取得（終了済み・未終了問わず）"""
+    sb = get_client()
     res = (
         sb.table("works")
-        .select("*")
+        .select(WORK_HOURS_COLUMNS)
         .eq("user_id", user_id)
         .gte("start_time", utc_start.isoformat())
         .lt("start_time", utc_end.isoformat())
         .order("start_time")
         .execute()
     )
-
-    rows = to_record(res) or []
-    total_hours = 0.0
-
-    for row in rows:
-        if row.get("start_time"):
-            start_dt = datetime.fromisoformat(row["start_time"].replace("Z", "+00:00"))
-
-            # 終了時刻がある場合のみ時間計算
-            if row.get("end_time"):
-                end_dt = datetime.fromisoformat(row["end_time"].replace("Z", "+00:00"))
-
-                # 指定月の範囲内での勤務時間を計算
-                # 開始時刻は必ず指定月内（クエリで絞り込み済み）
-                # 終了時刻が月をまたぐ場合は、月末までの時間のみ計算
-                effective_end = min(end_dt, utc_end.astimezone(timezone.utc))
-                work_duration = effective_end - start_dt
-
-                # 休憩時間を差し引く（月をまたぐ場合は比例配分）
-                break_minutes = row.get("break_time_min", 0) or 0
-                total_duration = end_dt - start_dt
-                if total_duration.total_seconds() > 0:
-                    break_ratio = work_duration.total_seconds() / total_duration.total_seconds()
-                    effective_break_minutes = break_minutes * break_ratio
-                else:
-                    effective_break_minutes = 0
-
-                work_minutes = work_duration.total_seconds() / 60 - effective_break_minutes
-                total_hours += max(0, work_minutes / 60)  # 負の値を防ぐ
-
-    return rows, total_hours
+    return to_record(res) or []
 
 
 def delete_work_record(work_id: str) -> bool:
@@ -278,11 +328,87 @@ def delete_work_record(work_id: str) -> bool:
     sb = get_client()
     try:
         res = sb.table("works").delete().eq("id", work_id).execute()
+        for row in to_record(res) or []:
+            work_hours_store.on_delete(row)
         return True
     except Exception:
         return False
 
 
+# ===== ページング =====
+
+MEMO_PAGE_SIZE = 30
+TASK_PAGE_SIZE = 20
+
+
+def encode_cursor(row: dict[str, Any]) -> str:
+    """(created_at, id) のキーセットカーソルを文字列化"""
+    created_at = row["created_at"]
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    return f"{created_at}|{row['id']}"
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    created_at, _, row_id = cursor.rpartition("|")
+    return created_at, row_id
+
+
+def _keyset_query(query: Any, limit: int, cursor: Optional[str], direction: str) -> Any:
+    """カーソル条件と並び順を付けたクエリを返す（続きの有無判定のため1件多く取得）"""
+    backward = direction == "prev" and cursor is not None
+    if cursor:
+        created_at, row_id = _decode_cursor(cursor)
+        op = "gt" if backward else "lt"
+        query = query.or_(
+            f'created_at.{op}."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.{op}.{row_id})'
+        )
+    return query.order("created_at", desc=not backward).order("id", desc=not backward).limit(limit + 1)
+
+
+def _keyset_result(
+    rows: list[dict[str, Any]],
+    limit: int,
+    cursor: Optional[str],
+    direction: str
+) -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+    """_keyset_query の取得結果を (行リスト（新しい順）, 次ページ, 前ページ) に整形"""
+    backward = direction == "prev" and cursor is not None
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+
+    has_next = bool(cursor) if backward else has_more
+    has_prev = has_more if backward else bool(cursor)
+    next_cursor = encode_cursor(rows[-1]) if rows and has_next else None
+    prev_cursor = encode_cursor(rows[0]) if rows and has_prev else None
+    return rows, next_cursor, prev_cursor
+
+
+def _fetch_keyset_page(
+    query: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    direction: str = "next"
+) -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    (created_at, id) の降順でキーセットページングして1ページ分を取得
+
+    Args:
+        query: 絞り込み済みのselectクエリ
+        limit: 1ページの件数
+        cursor: 基準となる行のカーソル（Noneなら先頭ページ）
+        direction: 'next'（カーソルより古い行）または 'prev'（カーソルより新しい行）
+
+    Returns:
+        (行リスト（新しい順）, 次ページのカーソル, 前ページのカーソル)
+    """
+    rows = to_record(_keyset_query(query, limit, cursor, direction).execute()) or []
+    return _keyset_result(rows, limit, cursor, direction)
+
+
 # ===== チャンネルメモ機能 =====
 
 def save_channel_memo(memo_data: dict[str, Any]) -> Optional[dict[str, Any]]:
@@ -299,32 +425,157 @@ def save_channel_memo(memo_data: dict[str, Any]) -> Optional[dict[str, Any]]:
     try:
         res = sb.table("channel_memos").insert(memo_data).execute()
         data = to_record(res)
+        if data:
+            _invalidate_memo_stats(data)
+            repository_cache.invalidate_rows("channel_memos", data)
+            memo_search_index.on_insert(data[0])
         return data[0] if data else None
     except Exception as e:
+        if is_unique_violation(e):
+            # 同じメッセージの再送。保存済みのメモを返す
+            return _get_channel_memo_by_message_ts(memo_data.get("channel_id"), memo_data.get("message_ts"))
         return None
 
 
+def is_unique_violation(error: Exception) -> bool:
+    """一意制約違反（既に保存済み）による失敗か"""
+    return getattr(error, "code", None) == "23505"
+
+
+def is_missing_function(error: Exception) -> bool:
+    """呼び出したRPC（DB関数）が未作成による失敗か（PostgREST PGRST202 / PostgreSQL 42883）"""
+    return getattr(error, "code", None) in ("PGRST202", "42883")
+
+
+def _get_channel_memo_by_message_ts(channel_id: Optional[str], message_ts: Optional[str]) -> Optional[dict[str, Any]]:
+    if not channel_id or not message_ts:
+        return None
+    sb = get_client()
+    try:
+        res = sb.table("channel_memos").select("*").eq("channel_id", channel_id).eq("message_ts", message_ts).limit(1).execute()
+        data = to_record(res) or []
+        return data[0] if data else None
+    except Exception as e:
+        return None
+
+
+MEMO_SEARCH_MODES = ("auto", "index", "fulltext", "ilike")
+
+# ひらがな・カタカナ・CJK統合漢字・半角カナ
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff\uff66-\uff9f]")
+
+
 def search_channel_memos(
     keyword: str,
     channel_id: Optional[str] = None,
     user_id: Optional[str] = None,
-    limit: int = 10
+    limit: int = 10,
+    mode: str = "auto"
 ) -> list[dict[str, Any]]:
     """
     チャンネルメモを検索
 
+    全文検索は idx_channel_memos_message_search（GIN）を使い、websearch 構文
+    （空白区切りで AND、`or` で OR、`"..."` でフレーズ、`-語` で除外）に対応する。
+    japanese 設定は空白・記号区切りのため、日本語のキーワードでは全文検索の結果に続けて
+    ILIKE の部分一致で件数を補う（id で重複を除く）。
+    MEMO_SEARCH_INDEX でプロセス内の n-gram 索引（db/memo_index.py）を有効にした場合のみ、
+    構築済みの索引で DB に問い合わせずに部分一致で検索する（既定は全文検索）。
+
     Args:
         keyword: 検索キーワード
         channel_id: チャンネルID（指定時はそのチャンネル内のみ検索）
         user_id: ユーザーID（指定時はそのユーザーのメモのみ検索）
         limit: 取得件数制限
+        mode: 'auto'（索引（有効時のみ） → 全文検索 → 日本語で件数が足りない場合はILIKEで補完）、
+            'index'、'fulltext'、'ilike'
 
     Returns:
-        検索結果のメモリスト（新しい順）
+        検索結果のメモリスト（全文検索は関連度順で、ILIKEでの補完分はその後ろ。索引・ILIKEは新しい順）。created_at は JST の datetime
     """
+    return normalize_timestamps(_search_channel_memos(keyword, channel_id, user_id, limit, mode))
+
+
+def _search_channel_memos(
+    keyword: str,
+    channel_id: Optional[str],
+    user_id: Optional[str],
+    limit: int,
+    mode: str
+) -> list[dict[str, Any]]:
+    if mode in ("auto", "index"):
+        memos = memo_search_index.search(keyword, channel_id, user_id, limit)
+        if memos is not None or mode == "index":
+            return memos or []
+
+    if mode == "ilike":
+        return _search_channel_memos_ilike(keyword, channel_id, user_id, limit)
+
+    memos = _search_channel_memos_fulltext(keyword, channel_id, user_id, limit)
+    if mode != "auto":
+        return memos or []
+    if memos is None:
+        return _search_channel_memos_ilike(keyword, channel_id, user_id, limit)
+    if len(memos) < limit and _CJK_PATTERN.search(keyword):
+        # 日本語は語の途中に一致しないため、残りの件数を ILIKE の部分一致で埋める
+        seen = {memo["id"] for memo in memos}
+        for memo in _search_channel_memos_ilike(keyword, channel_id, user_id, limit):
+            if len(memos) >= limit:
+                break
+            if memo["id"] not in seen:
+                seen.add(memo["id"])
+                memos.append(memo)
+    return memos
+
+
+def _search_channel_memos_fulltext(
+    keyword: str,
+    channel_id: Optional[str],
+    user_id: Optional[str],
+    limit: int
+) -> Optional[list[dict[str, Any]]]:
+    """全文検索（エラー時はNone）。ランキング用RPCがない場合は新しい順で返す"""
+    sb = get_client()
+    try:
+        res = sb.rpc("search_channel_memos_ranked", {
+            "p_query": keyword,
+            "p_channel_id": channel_id,
+            "p_user_id": user_id,
+            "p_limit": limit,
+        }).select(MEMO_SEARCH_COLUMNS).execute()
+        return to_record(res) or []
+    except Exception as e:
+        pass
+
+    try:
+        query = sb.table("channel_memos").select(MEMO_SEARCH_COLUMNS)
+
+        if channel_id:
+            query = query.eq("channel_id", channel_id)
+
+        if user_id:
+            query = query.eq("user_id", user_id)
+
+        query = query.order("created_at", desc=True).limit(limit)
+
+        # to_tsvector('japanese', message) @@ websearch_to_tsquery('japanese', keyword)
+        res = query.text_search("message", keyword, options={"type": "web_search", "config": "japanese"}).execute()
+        return to_record(res) or []
+
+    except Exception as e:
+        return None
+
+
+def _search_channel_memos_ilike(
+    keyword: str,
+    channel_id: Optional[str],
+    user_id: Optional[str],
+    limit: int
+) -> list[dict[str, Any]]:
+    """部分一致検索（大文字小文字区別なし）"""
     sb = get_client()
     try:
-        query = sb.table("channel_memos").select("*")
+        query = sb.table("channel_memos").select(MEMO_SEARCH_COLUMNS)
 
         # キーワード検索（大文字小文字区別なし）
         query = query.ilike("message", f"%{keyword}%")
@@ -359,11 +610,11 @@ def get_recent_channel_memos(
         limit: 取得件数制限
 
     Returns:
-        最近のメモリスト（新しい順）
+        最近のメモリスト（新しい順）。created_at は JST の datetime
     """
-    sb = get_client()
-    try:
-        query = sb.table("channel_memos").select("*")
+    def load() -> list[dict[str, Any]]:
+        sb = get_client()
+        query = sb.table("channel_memos").select(MEMO_RECENT_COLUMNS)
 
         # チャンネル絞り込み
         query = query.eq("channel_id", channel_id)
@@ -372,147 +623,248 @@ def get_recent_channel_memos(
         query = query.order("created_at", desc=True).limit(limit)
 
         res = query.execute()
-        return to_record(res) or []
+        return normalize_timestamps(to_record(res) or [])
 
+    try:
+        return repository_cache.get("channel_memos", channel_id, ("recent", limit), load)
     except Exception as e:
         return []
 
 
-def get_channel_memo_stats(channel_id: str) -> Optional[dict[str, Any]]:
+MEMO_STATS_TOP_N = 10
+
+# 集計結果のキャッシュ（(channel_id, top_n, JST日付) -> 統計）。メモの書き込みでチャンネル単位に破棄する
+_memo_stats_cache: TTLCache = TTLCache(
+    maxsize=int(os.getenv("MEMO_STATS_CACHE_SIZE", "256")),
+    ttl=PROCESS_CACHE_TTL,
+)
+_memo_stats_lock = threading.Lock()
+
+
+def _invalidate_memo_stats(rows: list[dict[str, Any]]) -> None:
+    """書き込んだメモのチャンネルの統計キャッシュを破棄"""
+    channel_ids = {row.get("channel_id") for row in rows}
+    with _memo_stats_lock:
+        for key in [k for k in _memo_stats_cache if None in channel_ids or k[0] in channel_ids]:
+            _memo_stats_cache.pop(key, None)
+
+
+def _memo_stats_windows(now_utc: datetime) -> dict[str, datetime]:
+    """統計用の期間境界（JST基準の今日・今週（月曜開始）・今月）をUTCで返す"""
+    jst_today = now_utc.astimezone(JST).date()
+    return {
+        "today_start": datetime.combine(jst_today, datetime.min.time(), tzinfo=JST).astimezone(timezone.utc),
+        "today_end": datetime.combine(jst_today, datetime.max.time(), tzinfo=JST).astimezone(timezone.utc),
+        "week_start": datetime.combine(
+            jst_today - timedelta(days=jst_today.weekday()),
+            datetime.min.time(),
+            tzinfo=JST
+        ).astimezone(timezone.utc),
+        "month_start": datetime.combine(
+            jst_today.replace(day=1),
+            datetime.min.time(),
+            tzinfo=JST
+        ).astimezone(timezone.utc),
+    }
+
+
+def _format_memo_date(value: Optional[str]) -> str:
+    if not value:
+        return "不明"
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.astimezone(JST).strftime("%Y/%m/%d")
+
+
+def get_channel_memo_stats(channel_id: str, top_n: int = MEMO_STATS_TOP_N) -> Optional[dict[str, Any]]:
     """
     チャンネルのメモ統計情報を取得
 
+    channel_memo_stats RPC（db/schema.sql）で1回の呼び出しで集計し、結果を PROCESS_CACHE_TTL 秒まで
+    保持する（save/update/delete_channel_memo で該当チャンネルのみ破棄）。
+    RPC が未作成（PGRST202）の環境でのみ個別クエリでの集計にフォールバックする。
+
     Args:
         channel_id: チャンネルID
+        top_n: ランキングに含めるユーザー数
 
     Returns:
-        統計情報辞書、エラー時はNone
+        統計情報辞書、メモがない場合・エラー時はNone（エラーはキャッシュしない）
     """
-    sb = get_client()
-    try:
-        # 総メモ数
-        count_res = sb.table("channel_memos").select("*", count="exact").eq("channel_id", channel_id).execute()
-        total_memos = count_res.count or 0
+    now_utc = utc_now()
+    # 今日・今週・今月の境界が変わったら別のキーにする
+    key = (channel_id, top_n, now_utc.astimezone(JST).date())
+    with _memo_stats_lock:
+        if key in _memo_stats_cache:
+            return _memo_stats_cache[key]
 
-        if total_memos == 0:
-            return None
+    try:
+        stats = _load_channel_memo_stats(channel_id, top_n, now_utc)
+    except Exception as e:
+        # エラーは「メモなし」としてキャッシュしない
+        return None
+    with _memo_stats_lock:
+        _memo_stats_cache[key] = stats
+    return stats
 
-        # 最初と最後のメモ日時
-        first_res = sb.table("channel_memos").select("created_at").eq("channel_id", channel_id).order("created_at", desc=False).limit(1).execute()
-        last_res = sb.table("channel_memos").select("created_at").eq("channel_id", channel_id).order("created_at", desc=True).limit(1).execute()
-
-        first_data = to_record(first_res)
-        last_data = to_record(last_res)
-
-        first_memo_date = "不明"
-        last_memo_date = "不明"
-
-        if first_data:
-            first_dt = datetime.fromisoformat(first_data[0]["created_at"].replace("Z", "+00:00"))
-            first_memo_date = first_dt.astimezone(JST).strftime("%Y/%m/%d")
-
-        if last_data:
-            last_dt = datetime.fromisoformat(last_data[0]["created_at"].replace("Z", "+00:00"))
-            last_memo_date = last_dt.astimezone(JST).strftime("%Y/%m/%d")
-
-        # ユーザー別メモ数（上位ユーザー）
-        # Supabaseでは集計が制限されるため、Pythonで処理
-        all_memos_res = sb.table("channel_memos").select("user_id, user_name").eq("channel_id", channel_id).execute()
-        all_memos = to_record(all_memos_res) or []
-
-        # ユーザー別カウント
-        user_counts = {}
-        unique_users = set()
-
-        for memo in all_memos:
-            user_id = memo["user_id"]
-            user_name = memo["user_name"]
-            unique_users.add(user_id)
-
-            if user_id not in user_counts:
-                user_counts[user_id] = {"user_name": user_name, "memo_count": 0}
-            user_counts[user_id]["memo_count"] += 1
-
-        # 上位ユーザーをソート
-        top_users = sorted(user_counts.values(), key=lambda x: x["memo_count"], reverse=True)
-
-        # 今日のメモ数を計算
-        now_utc = utc_now()
-        jst_today = now_utc.astimezone(JST).date()
-        today_start = datetime.combine(jst_today, datetime.min.time(), tzinfo=JST).astimezone(timezone.utc)
-        today_end = datetime.combine(jst_today, datetime.max.time(), tzinfo=JST).astimezone(timezone.utc)
-
-        today_res = (
-            sb.table("channel_memos")
-            .select("*", count="exact")
-            .eq("channel_id", channel_id)
-            .gte("created_at", today_start.isoformat())
-            .lte("created_at", today_end.isoformat())
-            .execute()
-        )
-        today_memos = today_res.count or 0
 
-        # 今週のメモ数を計算（月曜日開始）
-        jst_now = now_utc.astimezone(JST)
-        days_since_monday = jst_now.weekday()  # 0=月曜日
-        week_start = datetime.combine(
-            jst_today - timedelta(days=days_since_monday),
-            datetime.min.time(),
-            tzinfo=JST
-        ).astimezone(timezone.utc)
-
-        week_res = (
-            sb.table("channel_memos")
-            .select("*", count="exact")
-            .eq("channel_id", channel_id)
-            .gte("created_at", week_start.isoformat())
-            .execute()
-        )
-        week_memos = week_res.count or 0
+def _load_channel_memo_stats(channel_id: str, top_n: int, now_utc: datetime) -> Optional[dict[str, Any]]:
+    sb = get_client()
+    windows = _memo_stats_windows(now_utc)
+    try:
+        res = sb.rpc("channel_memo_stats", {
+            "p_channel_id": channel_id,
+            "p_today_start": windows["today_start"].isoformat(),
+            "p_today_end": windows["today_end"].isoformat(),
+            "p_week_start": windows["week_start"].isoformat(),
+            "p_month_start": windows["month_start"].isoformat(),
+            "p_top_n": top_n,
+        }).execute()
+        data = to_record(res)
+    except Exception as e:
+        if not is_missing_function(e):
+            logger.warning("channel_memo_stats RPC failed for %s: %s", channel_id, e)
+            raise
+        return _get_channel_memo_stats_by_queries(channel_id)
+
+    if isinstance(data, list):
+        data = data[0] if data else None
+    if not data or not data.get("total_memos"):
+        return None
 
-        # 今月のメモ数を計算
-        month_start = datetime.combine(
-            jst_today.replace(day=1),
-            datetime.min.time(),
-            tzinfo=JST
-        ).astimezone(timezone.utc)
-
-        month_res = (
-            sb.table("channel_memos")
-            .select("*", count="exact")
-            .eq("channel_id", channel_id)
-            .gte("created_at", month_start.isoformat())
-            .execute()
-        )
-        month_memos = month_res.count or 0
-
-        # ユーザーランキング用のデータを準備
-        user_rankings = []
-        for user_id, user_data in user_counts.items():
-            user_rankings.append({
-                "user_id": user_id,
-                "user_name": user_data["user_name"],
-                "memo_count": user_data["memo_count"]
-            })
-
-        # メモ数でソート
-        user_rankings.sort(key=lambda x: x["memo_count"], reverse=True)
-
-        return {
-            "total_memos": total_memos,
-            "today_memos": today_memos,
-            "week_memos": week_memos,
-            "month_memos": month_memos,
-            "unique_users": len(unique_users),
-            "first_memo_date": first_memo_date,
-            "last_memo_date": last_memo_date,
-            "top_users": top_users,
-            "user_rankings": user_rankings
+    user_rankings = [
+        {
+            "user_id": r["user_id"],
+            "user_name": r.get("user_name"),
+            "memo_count": r["memo_count"],
         }
+        for r in data.get("user_rankings") or []
+    ]
+
+    return {
+        "total_memos": data["total_memos"],
+        "today_memos": data.get("today_memos", 0),
+        "week_memos": data.get("week_memos", 0),
+        "month_memos": data.get("month_memos", 0),
+        "unique_users": data.get("unique_users", 0),
+        "first_memo_date": _format_memo_date(data.get("first_created_at")),
+        "last_memo_date": _format_memo_date(data.get("last_created_at")),
+        "top_users": [{"user_name": r["user_name"], "memo_count": r["memo_count"]} for r in user_rankings],
+        "user_rankings": user_rankings
+    }
 
-    except Exception as e:
+
+def _get_channel_memo_stats_by_queries(channel_id: str) -> Optional[dict[str, Any]]:
+    """チャンネルのメモ統計情報を個別クエリで集計（RPC未作成時のフォールバック、エラーは呼び出し元へ送出）"""
+    sb = get_client()
+    # 総メモ数
+    count_res = sb.table("channel_memos").select("id", count="exact", head=True).eq("channel_id", channel_id).execute()
+    total_memos = count_res.count or 0
+
+    if total_memos == 0:
         return None
 
+    # 最初と最後のメモ日時
+    first_res = sb.table("channel_memos").select("created_at").eq("channel_id", channel_id).order("created_at", desc=False).limit(1).execute()
+    last_res = sb.table("channel_memos").select("created_at").eq("channel_id", channel_id).order("created_at", desc=True).limit(1).execute()
+
+    first_data = to_record(first_res)
+    last_data = to_record(last_res)
+
+    first_memo_date = "不明"
+    last_memo_date = "不明"
+
+    if first_data:
+        first_dt = datetime.fromisoformat(first_data[0]["created_at"].replace("Z", "+00:00"))
+        first_memo_date = first_dt.astimezone(JST).strftime("%Y/%m/%d")
+
+    if last_data:
+        last_dt = datetime.fromisoformat(last_data[0]["created_at"].replace("Z", "+00:00"))
+        last_memo_date = last_dt.astimezone(JST).strftime("%Y/%m/%d")
+
+    # ユーザー別メモ数（上位ユーザー）
+    # Supabaseでは集計が制限されるため、Pythonで処理
+    all_memos_res = sb.table("channel_memos").select("user_id, user_name").eq("channel_id", channel_id).execute()
+    all_memos = to_record(all_memos_res) or []
+
+    # ユーザー別カウント
+    user_counts = {}
+    unique_users = set()
+
+    for memo in all_memos:
+        user_id = memo["user_id"]
+        user_name = memo["user_name"]
+        unique_users.add(user_id)
+
+        if user_id not in user_counts:
+            user_counts[user_id] = {"user_name": user_name, "memo_count": 0}
+        user_counts[user_id]["memo_count"] += 1
+
+    # 上位ユーザーをソート
+    top_users = sorted(user_counts.values(), key=lambda x: x["memo_count"], reverse=True)
+
+    # 今日のメモ数を計算
+    windows = _memo_stats_windows(utc_now())
+    today_start = windows["today_start"]
+    today_end = windows["today_end"]
+
+    today_res = (
+        sb.table("channel_memos")
+        .select("id", count="exact", head=True)
+        .eq("channel_id", channel_id)
+        .gte("created_at", today_start.isoformat())
+        .lte("created_at", today_end.isoformat())
+        .execute()
+    )
+    today_memos = today_res.count or 0
+
+    # 今週のメモ数を計算（月曜日開始）
+    week_start = windows["week_start"]
+
+    week_res = (
+        sb.table("channel_memos")
+        .select("id", count="exact", head=True)
+        .eq("channel_id", channel_id)
+        .gte("created_at", week_start.isoformat())
+        .execute()
+    )
+    week_memos = week_res.count or 0
+
+    # 今月のメモ数を計算
+    month_start = windows["month_start"]
+
+    month_res = (
+        sb.table("channel_memos")
+        .select("id", count="exact", head=True)
+        .eq("channel_id", channel_id)
+        .gte("created_at", month_start.isoformat())
+        .execute()
+    )
+    month_memos = month_res.count or 0
+
+    # ユーザーランキング用のデータを準備
+    user_rankings = []
+    for user_id, user_data in user_counts.items():
+        user_rankings.append({
+            "user_id": user_id,
+            "user_name": user_data["user_name"],
+            "memo_count": user_data["memo_count"]
+        })
+
+    # メモ数でソート
+    user_rankings.sort(key=lambda x: x["memo_count"], reverse=True)
+
+    return {
+        "total_memos": total_memos,
+        "today_memos": today_memos,
+        "week_memos": week_memos,
+        "month_memos": month_memos,
+        "unique_users": len(unique_users),
+        "first_memo_date": first_memo_date,
+        "last_memo_date": last_memo_date,
+        "top_users": top_users,
+        "user_rankings": user_rankings
+    }
+
 
 def get_recent_memos(channel_id: str, days: int = 7, limit: int = 20) -> list[dict[str, Any]]:
     """
@@ -524,22 +876,24 @@ def get_recent_memos(channel_id: str, days: int = 7, limit: int = 20) -> list[di
         limit: 最大取得件数
 
     Returns:
-        最近のメモリスト（新しい順）
+        最近のメモリスト（新しい順）。created_at は JST の datetime
     """
-    sb = get_client()
-    try:
+    def load() -> list[dict[str, Any]]:
+        sb = get_client()
         # 指定日数前の日時を計算
         since_date = utc_now() - timedelta(days=days)
         since_str = since_date.isoformat()
 
-        query = sb.table("channel_memos").select("*")
+        query = sb.table("channel_memos").select(MEMO_RECENT_COLUMNS)
         query = query.eq("channel_id", channel_id)
         query = query.gte("created_at", since_str)
         query = query.order("created_at", desc=True).limit(limit)
 
         res = query.execute()
-        return to_record(res) or []
+        return normalize_timestamps(to_record(res) or [])
 
+    try:
+        return repository_cache.get("channel_memos", channel_id, ("recent_days", days, limit), load)
     except Exception as e:
         return []
 
@@ -560,6 +914,8 @@ def save_channel_task(task_data: dict[str, Any]) -> Optional[dict[str, Any]]:
     try:
         res = sb.table("channel_tasks").insert(task_data).execute()
         data = to_record(res)
+        if data:
+            repository_cache.invalidate_rows("channel_tasks", data)
         return data[0] if data else None
     except Exception as e:
         return None
@@ -581,11 +937,11 @@ def get_channel_tasks(
         limit: 取得件数制限
 
     Returns:
-        タスクリスト（新しい順）
+        タスクリスト（新しい順）。created_at は JST の datetime
     """
-    sb = get_client()
-    try:
-        query = sb.table("channel_tasks").select("*")
+    def load() -> list[dict[str, Any]]:
+        sb = get_client()
+        query = sb.table("channel_tasks").select(TASK_LIST_COLUMNS)
         query = query.eq("channel_id", channel_id)
 
         if status:
@@ -597,12 +953,72 @@ def get_channel_tasks(
         query = query.order("created_at", desc=True).limit(limit)
 
         res = query.execute()
-        return to_record(res) or []
+        return normalize_timestamps(to_record(res) or [])
 
+    try:
+        return repository_cache.get("channel_tasks", channel_id, ("list", status, user_id, limit), load)
     except Exception as e:
         return []
 
 
+def get_channel_tasks_page(
+    channel_id: str,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    limit: int = TASK_PAGE_SIZE,
+    status: Optional[str] = None
+) -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    チャンネルのタスクを1ページ分取得
+
+    Args:
+        channel_id: チャンネルID
+        cursor: 基準となるタスクのカーソル（Noneなら最新ページ）
+        direction: 'next'（古い方）または 'prev'（新しい方）
+        limit: 1ページの件数
+        status: タスクステータス（指定時はそのステータスのタスクのみ）
+
+    Returns:
+        (タスクリスト（新しい順）, 次ページのカーソル, 前ページのカーソル)
+    """
+    def load() -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+        sb = get_client()
+        query = sb.table("channel_tasks").select(TASK_LIST_COLUMNS).eq("channel_id", channel_id)
+        if status:
+            query = query.eq("status", status)
+        rows, next_cursor, prev_cursor = _fetch_keyset_page(query, limit, cursor, direction)
+        return normalize_timestamps(rows), next_cursor, prev_cursor
+
+    try:
+        return repository_cache.get("channel_tasks", channel_id, ("page", status, cursor, direction, limit), load)
+    except Exception as e:
+        return [], None, None
+
+
+def count_channel_tasks(channel_id: str, status: Optional[str] = None) -> Optional[int]:
+    """
+    チャンネルのタスク件数を取得
+
+    Args:
+        channel_id: チャンネルID
+        status: タスクステータス（指定時はそのステータスの件数）
+
+    Returns:
+        件数、エラー時はNone
+    """
+    def load() -> int:
+        sb = get_client()
+        query = sb.table("channel_tasks").select("id", count="exact", head=True).eq("channel_id", channel_id)
+        if status:
+            query = query.eq("status", status)
+        return query.execute().count or 0
+
+    try:
+        return repository_cache.get("channel_tasks", channel_id, ("count", status), load)
+    except Exception as e:
+        return None
+
+
 def update_task_status(
     task_id: str,
     status: str,
@@ -630,12 +1046,59 @@ def update_task_status(
             update_data["completed_at"] = completed_at.isoformat()
 
         res = sb.table("channel_tasks").update(update_data).eq("id", task_id).execute()
-        return len(to_record(res) or []) > 0
+        rows = to_record(res) or []
+        repository_cache.invalidate_rows("channel_tasks", rows)
+        return len(rows) > 0
 
     except Exception as e:
         return False
 
 
+def toggle_task_status(task_id: str) -> Optional[dict[str, Any]]:
+    """
+    タスクの完了/未完了を1回の更新で切り替え
+
+    Args:
+        task_id: タスクID
+
+    Returns:
+        切り替え後のタスクデータ、見つからない場合・エラー時はNone
+    """
+    sb = get_client()
+    try:
+        res = sb.rpc("toggle_channel_task_status", {"p_task_id": task_id}).execute()
+        rows = to_record(res) or []
+    except Exception as e:
+        rows = _toggle_task_status_by_queries(task_id)
+
+    repository_cache.invalidate_rows("channel_tasks", rows)
+    return rows[0] if rows else None
+
+
+def _toggle_task_status_by_queries(task_id: str) -> list[dict[str, Any]]:
+    """関数が未作成の環境向け。読み込んだステータスを条件に更新し、同時の切り替えと競合しないようにする"""
+    sb = get_client()
+    try:
+        res = sb.table("channel_tasks").select("status").eq("id", task_id).limit(1).execute()
+        current = to_record(res) or []
+        if not current:
+            return []
+
+        status = current[0]["status"]
+        completed = status != "completed"
+        now_str = utc_now().isoformat()
+        update_data = {
+            "status": "completed" if completed else "pending",
+            "completed_at": now_str if completed else None,
+            "updated_at": now_str
+        }
+        res = sb.table("channel_tasks").update(update_data).eq("id", task_id).eq("status", status).execute()
+        return to_record(res) or []
+
+    except Exception as e:
+        return []
+
+
 def update_task_content(task_id: str, task_name: str, description: str = None) -> bool:
     """
     タスクの内容を更新
@@ -659,7 +1122,9 @@ def update_task_content(task_id: str, task_name: str, description: str = None) -
             update_data["description"] = description
 
         res = sb.table("channel_tasks").update(update_data).eq("id", task_id).execute()
-        return len(to_record(res) or []) > 0
+        rows = to_record(res) or []
+        repository_cache.invalidate_rows("channel_tasks", rows)
+        return len(rows) > 0
 
     except Exception as e:
         return False
@@ -678,6 +1143,7 @@ def delete_task(task_id: str) -> bool:
     sb = get_client()
     try:
         res = sb.table("channel_tasks").delete().eq("id", task_id).execute()
+        repository_cache.invalidate_rows("channel_tasks", to_record(res) or [])
         return True
     except Exception as e:
         return False
@@ -710,21 +1176,53 @@ def get_all_channel_memos(channel_id: str, limit: int = 50) -> list[dict[str, An
         limit: 取得件数制限
 
     Returns:
-        メモリスト（新しい順）
+        メモリスト（新しい順）。created_at は JST の datetime
     """
-    sb = get_client()
-    try:
-        query = sb.table("channel_memos").select("*")
+    def load() -> list[dict[str, Any]]:
+        sb = get_client()
+        query = sb.table("channel_memos").select(MEMO_LIST_COLUMNS)
         query = query.eq("channel_id", channel_id)
         query = query.order("created_at", desc=True).limit(limit)
 
         res = query.execute()
-        return to_record(res) or []
+        return normalize_timestamps(to_record(res) or [])
 
+    try:
+        return repository_cache.get("channel_memos", channel_id, ("all", limit), load)
     except Exception as e:
         return []
 
 
+def get_channel_memos_page(
+    channel_id: str,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    limit: int = MEMO_PAGE_SIZE
+) -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    チャンネルのメモを1ページ分取得（一覧表示用）
+
+    Args:
+        channel_id: チャンネルID
+        cursor: 基準となるメモのカーソル（Noneなら最新ページ）
+        direction: 'next'（古い方）または 'prev'（新しい方）
+        limit: 1ページの件数
+
+    Returns:
+        (メモリスト（新しい順）, 次ページのカーソル, 前ページのカーソル)
+    """
+    def load() -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+        sb = get_client()
+        query = sb.table("channel_memos").select(MEMO_LIST_COLUMNS).eq("channel_id", channel_id)
+        rows, next_cursor, prev_cursor = _fetch_keyset_page(query, limit, cursor, direction)
+        return normalize_timestamps(rows), next_cursor, prev_cursor
+
+    try:
+        return repository_cache.get("channel_memos", channel_id, ("page", cursor, direction, limit), load)
+    except Exception as e:
+        return [], None, None
+
+
 def get_channel_memo_by_id(memo_id: str) -> Optional[dict[str, Any]]:
     """
     IDによるメモの取得
@@ -775,7 +1273,12 @@ def update_channel_memo(memo_id: str, new_message: str) -> bool:
             "message": new_message,
             "updated_at": "now()"
         }).eq("id", memo_id).execute()
-        return len(to_record(res) or []) > 0
+        rows = to_record(res) or []
+        _invalidate_memo_stats(rows)
+        repository_cache.invalidate_rows("channel_memos", rows)
+        for row in rows:
+            memo_search_index.on_update(row)
+        return len(rows) > 0
     except Exception as e:
         return False
 
@@ -800,6 +1303,11 @@ def delete_channel_memo(memo_id: str) -> bool:
             return False
 
         res = sb.table("channel_memos").delete().eq("id", memo_id).execute()
-        return len(to_record(res) or []) > 0
+        rows = to_record(res) or []
+        _invalidate_memo_stats(rows)
+        repository_cache.invalidate_rows("channel_memos", rows)
+        for row in rows:
+            memo_search_index.on_delete(row)
+        return len(rows) > 0
     except Exception as e:
         return False
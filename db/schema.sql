@@ -76,3 +76,110 @@ create index if not exists idx_channel_tasks_channel_id on public.channel_tasks(
 create index if not exists idx_channel_tasks_status on public.channel_tasks(status);
 create index if not exists idx_channel_tasks_user_id on public.channel_tasks(user_id);
 create index if not exists idx_channel_tasks_created_at on public.channel_tasks(created_at desc);
+
+-- メモ統計（1回の呼び出しで件数・期間・上位ユーザーを集計）
+create or replace function public.channel_memo_stats(
+  p_channel_id text,
+  p_today_start timestamptz,
+  p_today_end timestamptz,
+  p_week_start timestamptz,
+  p_month_start timestamptz,
+  p_top_n integer default 10
+) returns json
+language sql stable as $$
+  select json_build_object(
+    'total_memos', count(*),
+    'today_memos', count(*) filter (where m.created_at >= p_today_start and m.created_at <= p_today_end),
+    'week_memos', count(*) filter (where m.created_at >= p_week_start),
+    'month_memos', count(*) filter (where m.created_at >= p_month_start),
+    'unique_users', count(distinct m.user_id),
+    'first_created_at', min(m.created_at),
+    'last_created_at', max(m.created_at),
+    'user_rankings', (
+      select coalesce(json_agg(r order by r.memo_count desc), '[]'::json)
+      from (
+        select u.user_id, max(u.user_name) as user_name, count(*) as memo_count
+        from public.channel_memos u
+        where u.channel_id = p_channel_id
+        group by u.user_id
+        order by count(*) desc
+        limit p_top_n
+      ) r
+    )
+  )
+  from public.channel_memos m
+  where m.channel_id = p_channel_id;
+$$;
+
+-- メモ全文検索（japanese 設定は simple のコピー）
+do $$
+begin
+  if not exists (select 1 from pg_ts_config where cfgname = 'japanese') then
+    create text search configuration public.japanese (copy = pg_catalog.simple);
+  end if;
+end
+$$;
+
+create index if not exists idx_channel_memos_message_search
+  on public.channel_memos using gin (to_tsvector('japanese', message));
+
+-- 全文検索（websearch 構文: 空白区切りで AND、or で OR、"..." でフレーズ）をランキング順で返す
+create or replace function public.search_channel_memos_ranked(
+  p_query text,
+  p_channel_id text default null,
+  p_user_id text default null,
+  p_limit integer default 10
+) returns setof public.channel_memos
+language sql stable as $$
+  select m.*
+  from public.channel_memos m,
+       websearch_to_tsquery('japanese', p_query) q
+  where to_tsvector('japanese', m.message) @@ q
+    and (p_channel_id is null or m.channel_id = p_channel_id)
+    and (p_user_id is null or m.user_id = p_user_id)
+  order by ts_rank(to_tsvector('japanese', m.message), q) desc, m.created_at desc
+  limit p_limit;
+$$;
+
+-- 一覧のキーセットページング用（channel_id で絞り込み、(created_at, id) の降順）
+create index if not exists idx_channel_memos_channel_created_id on public.channel_memos(channel_id, created_at desc, id desc);
+create index if not exists idx_channel_tasks_channel_created_id on public.channel_tasks(channel_id, created_at desc, id desc);
+-- ステータス別の一覧（キーセットページング）と件数用
+create index if not exists idx_channel_tasks_channel_status_created_id on public.channel_tasks(channel_id, status, created_at desc, id desc);
+
+-- タスクの完了/未完了を1文で切り替え、更新後の行を返す（SET 内の status は更新前の値）
+create or replace function public.toggle_channel_task_status(
+  p_task_id uuid
+) returns setof public.channel_tasks
+language sql volatile as $$
+  update public.channel_tasks
+     set status = case when status = 'completed' then 'pending' else 'completed' end,
+         completed_at = case when status = 'completed' then null else now() end,
+         updated_at = now()
+   where id = p_task_id
+  returning *;
+$$;
+
+-- Slack の再送による二重保存を防ぐ一意キー（任意）
+-- 既存データに同じ (channel_id, message_ts) の行がある場合は、重複を削除してから作成すること
+create unique index if not exists uq_channel_memos_channel_message_ts on public.channel_memos(channel_id, message_ts);
+
+-- スプレッドシート差分同期（google/sync.py）の (updated_at, id) 透かし用
+create index if not exists idx_works_updated_id on public.works(updated_at, id);
+create index if not exists idx_attendance_updated_id on public.attendance(updated_at, id);
+
+-- 更新時の updated_at は DB の時刻で付ける（挿入時の default now() と同じ時計に揃える）
+create or replace function public.set_updated_at() returns trigger
+language plpgsql as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$;
+
+drop trigger if exists trg_works_updated_at on public.works;
+create trigger trg_works_updated_at before update on public.works
+  for each row execute function public.set_updated_at();
+drop trigger if exists trg_attendance_updated_at on public.attendance;
+create trigger trg_attendance_updated_at before update on public.attendance
+  for each row execute function public.set_updated_at();
@@ -1,26 +1,65 @@
+import asyncio
 import os
+import threading
 from typing import Any, Optional
 
-from supabase import create_client, Client
+from supabase import AsyncClient, Client, acreate_client, create_client
 
 
 _client: Optional[Client] = None
+# fork 後の子プロセスでは親の接続プールを使わないよう、生成したプロセスを記録する
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+# asyncio モード用（httpx の接続プールはイベントループに紐づくためループごとに保持）
+_async_client: Optional[AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
 
 
-def get_client() -> Client:
-    global _client
-    if _client is not None:
-        return _client
-
+def _credentials() -> tuple[str, str]:
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
     if not url or not key:
         raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in environment")
+    return url, key
+
 
-    _client = create_client(url, key)
+def get_client() -> Client:
+    """
+    プロセスごとの同期クライアントを返す
+
+    gunicorn などで fork された各ワーカーは、最初の呼び出し時に自分用のクライアントを生成する。
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            _client = create_client(*_credentials())
+            _client_pid = pid
     return _client
 
 
+def reset_client() -> None:
+    """保持しているクライアントを破棄（次回の get_client で再生成）"""
+    global _client, _client_pid, _async_client, _async_client_loop
+    _client = _client_pid = None
+    _async_client = _async_client_loop = None
+
+
+async def get_async_client() -> AsyncClient:
+    """実行中のイベントループ用の非同期クライアントを返す"""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is not None and _async_client_loop is loop:
+        return _async_client
+
+    _async_client = await acreate_client(*_credentials())
+    _async_client_loop = loop
+    return _async_client
+
+
 def to_record(res: Any) -> Any:
     """Normalize supabase-py v2 response data."""
     return getattr(res, "data", res)
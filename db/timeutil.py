@@ -0,0 +1,57 @@
+"""
+日時の共通処理
+
+JST と timestamptz 文字列の変換。repository.py と work_hours.py の両方から使うため、
+どちらにも依存しないモジュールに置く。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+JST = timezone(timedelta(hours=9))
+
+
+# UTCオフセット文字列 -> timezone（PostgREST は通常 "+00:00" のみ返す）
+_TZ_OFFSETS: dict[str, timezone] = {"": timezone.utc, "Z": timezone.utc, "+00:00": timezone.utc, "+09:00": JST}
+
+
+def _parse_offset(text: str) -> timezone:
+    tz = _TZ_OFFSETS.get(text)
+    if tz is None:
+        digits = text[1:].replace(":", "")
+        if text[:1] not in "+-" or len(digits) not in (2, 4) or not digits.isdigit():
+            raise ValueError(f"invalid UTC offset: {text!r}")
+        delta = timedelta(hours=int(digits[:2]), minutes=int(digits[2:] or 0))
+        tz = _TZ_OFFSETS[text] = timezone(-delta if text[0] == "-" else delta)
+    return tz
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    timestamptz の文字列を JST の datetime に変換
+
+    "YYYY-MM-DDTHH:MM:SS[.f...][±HH:MM|Z]" を固定位置で読み取る。
+    小数秒は桁数によらず6桁に揃え、オフセットなしは UTC とみなす。解釈できなければ None。
+    """
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).astimezone(JST)
+    if not isinstance(value, str) or len(value) < 19 or value[4] != "-" or value[10] not in "T ":
+        return None
+    try:
+        pos = 19
+        micro = 0
+        if value[pos:pos + 1] == ".":
+            end = pos + 1
+            while end < len(value) and value[end].isdigit():
+                end += 1
+            micro = int(value[pos + 1:end][:6].ljust(6, "0"))
+            pos = end
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19]),
+            micro, tzinfo=_parse_offset(value[pos:]),
+        ).astimezone(JST)
+    except ValueError:
+        return None
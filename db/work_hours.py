@@ -0,0 +1,164 @@
+"""
+月別勤務時間の集計
+
+works の1行ごとの内訳（月内の実効勤務時間・休憩の比例配分・月またぎ）を1回だけ計算し、
+ユーザー・年月ごとの集計として保持する。
+start_work / end_work / delete_work_record の書き込み時に該当月の集計を更新し、
+集計がない（未読み込み・期限切れ）場合は works から取得し直して再計算する。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from cachetools import TTLCache
+
+from .read_cache import PROCESS_CACHE_TTL
+from .timeutil import JST, parse_timestamp
+
+
+def month_range_utc(year: int, month: int) -> tuple[datetime, datetime]:
+    """JST の指定月の [月初, 翌月初) を UTC で返す"""
+    jst_start = datetime(year, month, 1, tzinfo=JST)
+    if month == 12:
+        jst_end = datetime(year + 1, 1, 1, tzinfo=JST)
+    else:
+        jst_end = datetime(year, month + 1, 1, tzinfo=JST)
+    return jst_start.astimezone(timezone.utc), jst_end.astimezone(timezone.utc)
+
+
+def work_row_breakdown(row: dict[str, Any], month_end_utc: datetime) -> dict[str, Any]:
+    """
+    勤務記録1行に内訳を付けたコピーを返す
+
+    追加するキー:
+        break_time_min: 休憩時間（分）
+        start_dt / end_dt: 開始・終了の datetime（未終了なら end_dt は None）
+        work_hours: 月内分の勤務時間（休憩は月内の割合で比例配分、未終了なら None）
+        crosses_month: 終了が翌月にかかるか
+    """
+    start_dt = parse_timestamp(row.get("start_time"))
+    end_dt = parse_timestamp(row.get("end_time"))
+    break_minutes = row.get("break_time_min", row.get("break_time")) or 0
+    work_hours = None
+    crosses_month = False
+
+    if start_dt and end_dt:
+        # 開始時刻は必ず指定月内。終了が月をまたぐ場合は月末までの時間のみ計算
+        effective_end = min(end_dt, month_end_utc)
+        crosses_month = end_dt > month_end_utc
+        work_duration = effective_end - start_dt
+
+        total_duration = end_dt - start_dt
+        if total_duration.total_seconds() > 0:
+            effective_break_minutes = break_minutes * work_duration.total_seconds() / total_duration.total_seconds()
+        else:
+            effective_break_minutes = 0
+
+        work_minutes = work_duration.total_seconds() / 60 - effective_break_minutes
+        work_hours = max(0, work_minutes / 60)  # 負の値を防ぐ
+
+    return {
+        **row,
+        "break_time_min": break_minutes,
+        "start_dt": start_dt,
+        "end_dt": end_dt,
+        "work_hours": work_hours,
+        "crosses_month": crosses_month,
+    }
+
+
+@dataclass
+class MonthlyWorkHours:
+    """1ユーザー・1か月分の集計（rows は開始時刻順の内訳付き勤務記録）"""
+    rows: list[dict[str, Any]]
+    total_hours: float
+
+    @classmethod
+    def build(cls, rows: list[dict[str, Any]], month_end_utc: datetime) -> "MonthlyWorkHours":
+        return cls.from_breakdowns([work_row_breakdown(row, month_end_utc) for row in rows])
+
+    @classmethod
+    def from_breakdowns(cls, items: list[dict[str, Any]]) -> "MonthlyWorkHours":
+        items = sorted(items, key=lambda r: r["start_dt"])
+        return cls(items, sum(r["work_hours"] or 0 for r in items))
+
+
+class WorkHoursSummaryStore:
+    """(user_id, 年, 月) ごとの MonthlyWorkHours を保持する"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._summaries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        # 書き込みのたびに進める。読み込み中に書き込みがあった結果は保存しない
+        self._versions: dict[tuple[str, int, int], int] = {}
+        self._epoch = 0
+
+    @staticmethod
+    def _key_for_row(row: dict[str, Any]) -> Optional[tuple[str, int, int]]:
+        start_dt = parse_timestamp(row.get("start_time"))
+        if not row.get("user_id") or start_dt is None:
+            return None
+        start_jst = start_dt.astimezone(JST)
+        return row["user_id"], start_jst.year, start_jst.month
+
+    def get(
+        self,
+        user_id: str,
+        year: int,
+        month: int,
+        loader: Callable[[datetime, datetime], list[dict[str, Any]]]
+    ) -> MonthlyWorkHours:
+        """集計を返す。なければ loader(月初UTC, 翌月初UTC) で勤務記録を取得して計算"""
+        key = (user_id, year, month)
+        with self._lock:
+            summary = self._summaries.get(key)
+            version = (self._epoch, self._versions.get(key, 0))
+        if summary is not None:
+            return summary
+
+        utc_start, utc_end = month_range_utc(year, month)
+        summary = MonthlyWorkHours.build(loader(utc_start, utc_end), utc_end)
+        with self._lock:
+            if (self._epoch, self._versions.get(key, 0)) == version:
+                self._summaries[key] = summary
+        return summary
+
+    def on_upsert(self, row: dict[str, Any]) -> None:
+        """開始・終了した勤務記録を該当月の集計に反映"""
+        self._apply(row, remove=False)
+
+    def on_delete(self, row: dict[str, Any]) -> None:
+        """削除した勤務記録を該当月の集計から除く"""
+        self._apply(row, remove=True)
+
+    def _apply(self, row: dict[str, Any], remove: bool) -> None:
+        key = self._key_for_row(row)
+        if key is None:
+            # 月が分からない場合は全体を読み込み直す
+            self.clear()
+            return
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            summary = self._summaries.get(key)
+            if summary is None:
+                return
+            items = [r for r in summary.rows if r.get("id") != row.get("id")]
+            if not remove:
+                items.append(work_row_breakdown(row, month_range_utc(key[1], key[2])[1]))
+            self._summaries[key] = MonthlyWorkHours.from_breakdowns(items)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._summaries.clear()
+
+
+work_hours_store = WorkHoursSummaryStore(
+    maxsize=int(os.getenv("WORK_HOURS_SUMMARY_SIZE", "1024")),
+    ttl=PROCESS_CACHE_TTL,
+)
@@ -2,6 +2,8 @@ from boltApp import bolt_app
 """Menu and actions"""
 from datetime import datetime, timezone
 from db.repository import get_users, has_active_work, get_or_create_user
+from handlers.slack_cache import get_display_name
+from handlers.background import run_in_background
 
 def display_menu(say, body=None, client=None) -> None:
     # ユーザーの当日未終了勤務があるかで、開始/退勤ボタンを出し分け
@@ -11,11 +13,8 @@ def display_menu(say, body=None, client=None) -> None:
 		if body and isinstance(body, dict):
 			slack_user_id = body.get("user", {}).get("id") or body.get("event", {}).get("user")
 		user = None
-		display_name = None
-		if client and slack_user_id:
-			# プロフィールが取得できる場合は名前も
-			prof = client.users_profile_get(user=slack_user_id)
-			display_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
+		# プロフィールが取得できる場合は名前も
+		display_name = get_display_name(client, slack_user_id)
 		if slack_user_id:
 			user = get_or_create_user(slack_user_id, display_name)
 			show_end = has_active_work(user.id, datetime.now(timezone.utc))
@@ -45,6 +44,7 @@ def display_menu(say, body=None, client=None) -> None:
 
 
 @bolt_app.action("start_work")
+@run_in_background
 def handle_start_work(ack, body, say, logger):  # type: ignore[no-redef]
 	ack()
 	# 遅延インポートで循環を回避
@@ -53,6 +53,7 @@ def handle_start_work(ack, body, say, logger):  # type: ignore[no-redef]
 
 
 @bolt_app.action("end_work")
+@run_in_background
 def handle_end_work(ack, body, say, client=None):  # type: ignore[no-redef]
 	from handlers.workflows import prompt_end_work
 	from db.repository import get_or_create_user
@@ -61,18 +62,13 @@ def handle_end_work(ack, body, say, client=None):  # type: ignore[no-redef]
 
 	# ユーザー情報を取得
 	user_slack_id = body.get("user", {}).get("id")
-	display_name = None
-	if user_slack_id and client:
-		try:
-			prof = client.users_profile_get(user=user_slack_id)
-			display_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-		except Exception:
-			pass
+	display_name = get_display_name(client, user_slack_id)
 
 	user = get_or_create_user(user_slack_id or "unknown", display_name)
 	prompt_end_work(say, user_id=user.id)
 
 @bolt_app.action("update_attendance")
+@run_in_background
 def handle_update_attendance(ack, body, say):  # type: ignore[no-redef]
 	from handlers.attendance import prompt_attendance
 
@@ -80,6 +76,7 @@ def handle_update_attendance(ack, body, say):  # type: ignore[no-redef]
 	prompt_attendance(say)
 
 @bolt_app.action("check_attendance")
+@run_in_background
 def handle_check_attendance(ack, body, say, client):  # type: ignore[no-redef]
 	from handlers.attendance import show_attendance_overview
 
@@ -87,24 +84,19 @@ def handle_check_attendance(ack, body, say, client):  # type: ignore[no-redef]
 	show_attendance_overview(say, client)
 
 @bolt_app.action("user_info")
+@run_in_background
 def handle_user_info(ack, body, say, client, logger):  # type: ignore[no-redef]
 	from handlers.user_profile import show_or_edit_user
 
 	ack()
 	slack_user_id = body.get("user", {}).get("id")
 	# DM context: fetch Slack profile
-	try:
-		if slack_user_id:
-			prof = client.users_profile_get(user=slack_user_id)
-			real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-		else:
-			real_name = None
-	except Exception:
-		real_name = None
+	real_name = get_display_name(client, slack_user_id)
 	show_or_edit_user(say, real_name, slack_user_id)
 
 
 @bolt_app.action("show_DM_help")
+@run_in_background
 def handle_show_DM_help(ack, say):  # type: ignore[no-redef]
 	ack()
 	help_blocks = [
@@ -133,6 +125,7 @@ def handle_show_DM_help(ack, say):  # type: ignore[no-redef]
 	say(blocks=help_blocks, text="ハイテクラボ秘書さん使い方")
 
 @bolt_app.action("back_to_menu")
+@run_in_background
 def handle_back_to_menu(ack, body, say, client):  # type: ignore[no-redef]
 	ack()
 	display_menu(say, body, client)
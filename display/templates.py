@@ -0,0 +1,65 @@
+"""
+Block Kit テンプレート
+
+メニューやフォームのように毎回同じ構造のブロックは一度だけ組み立てて使い回す。
+日付などの可変部分は "{{名前}}" のスロットとして置き、render() で差し込む。
+返すリストの最上位は毎回新しいが、中の辞書はテンプレートと共有しているため変更しないこと。
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from typing import Any, Callable, Union
+
+_SLOT = re.compile(r"^\{\{(\w+)\}\}$")
+
+Path = tuple[Union[int, str], ...]
+
+
+class BlockTemplate:
+    """組み立て済みのブロックと、スロット位置（ルートからのキー列）を保持する"""
+
+    def __init__(self, blocks: list[dict[str, Any]]):
+        self._blocks = blocks
+        self._slots: list[tuple[Path, str]] = []
+        self._find_slots(blocks, ())
+
+    def _find_slots(self, node: Any, path: Path) -> None:
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            match = _SLOT.match(node) if isinstance(node, str) else None
+            if match:
+                self._slots.append((path, match.group(1)))
+            return
+        for key, child in items:
+            self._find_slots(child, path + (key,))
+
+    def render(self, **values: Any) -> list[dict[str, Any]]:
+        """スロットに値を差し込んだブロックを返す（スロットまでの経路だけ複製する）"""
+        root = list(self._blocks)
+        for path, name in self._slots:
+            node: Any = root
+            for key in path[:-1]:
+                child = node[key]
+                child = dict(child) if isinstance(child, dict) else list(child)
+                node[key] = child
+                node = child
+            node[path[-1]] = values[name]
+        return root
+
+
+def cached_blocks(builder: Callable[[], list[dict[str, Any]]]) -> Callable[[], list[dict[str, Any]]]:
+    """引数なしのブロック生成関数を、初回の結果を使い回すようにするデコレーター"""
+    template: list[BlockTemplate] = []
+
+    @functools.wraps(builder)
+    def wrapper() -> list[dict[str, Any]]:
+        if not template:
+            template.append(BlockTemplate(builder()))
+        return template[0].render()
+
+    return wrapper
@@ -1,8 +1,10 @@
 """
 Deprecated: 仕様変更によりSupabaseへ移行。必要があれば手動で参照。
+認証済みクライアントとワークシートはプロセス内で使い回す（定期同期は google/sync.py）。
 """
 import os
 import json
+import threading
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
@@ -10,13 +12,26 @@ SCOPES = [
 	"https://www.googleapis.com/auth/spreadsheets",
 ]
 
+_lock = threading.Lock()
+_client = None
+_worksheet = None
+
+
 def get_gsheet_client():
-	creds_dict = json.loads(os.environ["GOOGLE_CREDENTIALS"])
-	creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPES)
-	return gspread.authorize(creds)
+	"""認証済みの gspread クライアント（初回のみ認証）"""
+	global _client
+	with _lock:
+		if _client is None:
+			creds_dict = json.loads(os.environ["GOOGLE_CREDENTIALS"])
+			creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPES)
+			_client = gspread.authorize(creds)
+		return _client
 
 
 def _get_worksheet():
+	global _worksheet
+	if _worksheet is not None:
+		return _worksheet
 	gc = get_gsheet_client()
 	spreadsheet_id = os.environ["SPREADSHEET_ID"]
 	sh = gc.open_by_key(spreadsheet_id)
@@ -24,15 +39,15 @@ def _get_worksheet():
 	if ws is None:
 		# 初期ワークシートがない場合は作成（タイトルは任意）
 		ws = sh.add_worksheet(title="Sheet1", rows="100", cols="26")
-	return sh, ws
+	with _lock:
+		_worksheet = (sh, ws)
+	return _worksheet
 
 def add_row(data):
 	sh, ws = _get_worksheet()
-	# 既存データの最終行を取得
-	last_row = len(ws.get_all_values())
-	next_row = last_row + 1
 	# data は 2次元配列想定（[[val1, val2, ...], [...]] など）
-	ws.update(f"A{next_row}", data)
+	# 最終行の後ろへの追加は API 側で行う（シート全体は読み込まない）
+	ws.append_rows(data, value_input_option="RAW", insert_data_option="INSERT_ROWS", table_range="A1")
 	return sh.url
 
 def read_row(index: int) -> list[str]:
@@ -45,4 +60,4 @@ def update_row(index: int, data: list[list[str]]):
 	sh, ws = _get_worksheet()
 	row = index if index and index > 0 else 1
 	ws.update(f"A{row}", data)
-	return sh.url
\ No newline at end of file
+	return sh.url
@@ -0,0 +1,304 @@
+"""
+Google スプレッドシートへの差分同期
+
+works / attendance のうち、前回同期した (updated_at, id) 以降に変更された行だけを Supabase から取得し、
+テーブル名のワークシートへまとめて書き込む。新しい行は values_append で末尾に追加し、
+同期済みの行（退勤の記録・出勤予定の変更など）は values_batch_update で同じ行を上書きする。
+同期状態（透かし・id ごとの行番号・最終行）は JSON ファイルに保存する。
+
+updated_at は DB のトリガー（db/schema.sql の set_updated_at、now() = トランザクション開始時刻）で
+付けるため、後から確定したトランザクションの行が透かしより前の時刻を持つことがある。
+そのため毎回 透かし − SYNC_OVERLAP_SEC 秒 から読み直す（同期済みの行は同じ行への上書きになる）。
+削除された行は SYNC_RECONCILE_SEC 秒ごとに全 id と突き合わせて検出し、シートの行を空にする
+（行番号がずれないよう行自体は削除しない）。
+
+	python -m google.sync                 # 1回同期（cron などで定期実行）
+	python -m google.sync --memory        # スプレッドシートの代わりにメモリ上のバックエンドで確認
+
+複数プロセスから同時に実行しないこと（同期状態ファイルは1つ）。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Iterator, Optional
+
+from db.export import EXPORT_SPECS, ExportSpec
+from db.supabase_client import get_client, to_record
+from db.timeutil import parse_timestamp
+
+SYNC_TABLES = ("works", "attendance")
+SYNC_PAGE_SIZE = 500
+SYNC_ID_PAGE_SIZE = 1000
+# 透かしより前に確定した可能性がある行を拾うため読み直す秒数
+SYNC_OVERLAP_SEC = float(os.getenv("SHEETS_SYNC_OVERLAP_SEC", "300"))
+# 削除された行の突き合わせ間隔（秒）
+SYNC_RECONCILE_SEC = float(os.getenv("SHEETS_SYNC_RECONCILE_SEC", "3600"))
+
+_UPDATED_RANGE = re.compile(r"![A-Z]+(\d+)")
+
+
+class MemorySheetsBackend:
+	"""スプレッドシートの代わりにメモリ上の2次元配列へ書き込むバックエンド（テスト・確認用）"""
+
+	def __init__(self):
+		self.sheets: dict[str, list[list[Any]]] = {}
+		self.calls: list[str] = []
+
+	def clear(self, title: str) -> None:
+		self.calls.append("clear")
+		self.sheets[title] = []
+
+	def append_rows(self, title: str, rows: list[list[Any]]) -> int:
+		"""末尾に追加し、追加した先頭の行番号（1始まり）を返す"""
+		self.calls.append("values_append")
+		sheet = self.sheets.setdefault(title, [])
+		first = len(sheet) + 1
+		sheet.extend(list(row) for row in rows)
+		return first
+
+	def update_rows(self, title: str, updates: list[tuple[int, list[Any]]]) -> None:
+		"""(行番号, 値) の組をまとめて上書き"""
+		self.calls.append("values_batch_update")
+		sheet = self.sheets.setdefault(title, [])
+		for row_number, values in updates:
+			sheet[row_number - 1] = list(values)
+
+
+class GspreadSheetsBackend:
+	"""gspread のスプレッドシート API を使うバックエンド（認証・ワークシートは初回のみ取得）"""
+
+	def __init__(self, spreadsheet_id: Optional[str] = None):
+		self._spreadsheet_id = spreadsheet_id or os.environ["SPREADSHEET_ID"]
+		self._lock = threading.Lock()
+		self._spreadsheet = None
+		self._worksheets: dict[str, Any] = {}
+
+	def _get_spreadsheet(self):
+		with self._lock:
+			if self._spreadsheet is None:
+				from google.sheets import get_gsheet_client
+				self._spreadsheet = get_gsheet_client().open_by_key(self._spreadsheet_id)
+			return self._spreadsheet
+
+	def _get_worksheet(self, title: str):
+		if title in self._worksheets:
+			return self._worksheets[title]
+		import gspread
+
+		sh = self._get_spreadsheet()
+		try:
+			ws = sh.worksheet(title)
+		except gspread.WorksheetNotFound:
+			ws = sh.add_worksheet(title=title, rows=1000, cols=26)
+		with self._lock:
+			self._worksheets[title] = ws
+		return ws
+
+	def clear(self, title: str) -> None:
+		self._get_worksheet(title).clear()
+
+	def append_rows(self, title: str, rows: list[list[Any]]) -> int:
+		self._get_worksheet(title)
+		res = self._get_spreadsheet().values_append(
+			f"'{title}'!A1",
+			params={"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+			body={"values": rows},
+		)
+		return int(_UPDATED_RANGE.search(res["updates"]["updatedRange"]).group(1))
+
+	def update_rows(self, title: str, updates: list[tuple[int, list[Any]]]) -> None:
+		self._get_spreadsheet().values_batch_update(body={
+			"valueInputOption": "RAW",
+			"data": [{"range": f"'{title}'!A{row_number}", "values": [values]} for row_number, values in updates],
+		})
+
+
+def _cell(value: Any) -> Any:
+	return "" if value is None else value
+
+
+def iter_changed_rows(
+	spec: ExportSpec,
+	watermark: Optional[list[str]],
+	page_size: int = SYNC_PAGE_SIZE,
+	overlap_sec: float = SYNC_OVERLAP_SEC
+) -> Iterator[list[dict[str, Any]]]:
+	"""
+	watermark = [updated_at, id] の overlap_sec 秒前以降に変更された行を (updated_at, id) 順に1ページずつ返す
+
+	watermark が None なら全行。
+	"""
+	sb = get_client()
+	since = None
+	if watermark:
+		since = parse_timestamp(watermark[0]) - timedelta(seconds=overlap_sec)
+	cursor: Optional[list[str]] = None
+	while True:
+		query = sb.table(spec.table).select(", ".join(spec.column_names))
+		if cursor:
+			updated_at, row_id = cursor
+			query = query.or_(
+				f'updated_at.gt."{updated_at}",'
+				f'and(updated_at.eq."{updated_at}",id.gt.{row_id})'
+			)
+		elif since is not None:
+			query = query.gte("updated_at", since.isoformat())
+		rows = to_record(query.order("updated_at").order("id").limit(page_size).execute()) or []
+		if rows:
+			yield rows
+			cursor = [rows[-1]["updated_at"], rows[-1]["id"]]
+		if len(rows) < page_size:
+			return
+
+
+def iter_row_ids(table: str, page_size: int = SYNC_ID_PAGE_SIZE) -> Iterator[str]:
+	"""テーブルの全 id を id 順に返す（削除の突き合わせ用）"""
+	sb = get_client()
+	last_id = None
+	while True:
+		query = sb.table(table).select("id")
+		if last_id is not None:
+			query = query.gt("id", last_id)
+		rows = to_record(query.order("id").limit(page_size).execute()) or []
+		for row in rows:
+			yield row["id"]
+		if len(rows) < page_size:
+			return
+		last_id = rows[-1]["id"]
+
+
+def _watermark_key(watermark: Optional[list[str]]) -> tuple:
+	if not watermark:
+		return ()
+	return parse_timestamp(watermark[0]), watermark[1]
+
+
+class SheetsSync:
+	"""テーブルごとの同期状態を持ち、変更された行をまとめてスプレッドシートへ反映する"""
+
+	def __init__(
+		self,
+		backend: Any,
+		state_path: Optional[str] = None,
+		page_size: int = SYNC_PAGE_SIZE,
+		overlap_sec: float = SYNC_OVERLAP_SEC,
+		reconcile_sec: float = SYNC_RECONCILE_SEC
+	):
+		self._backend = backend
+		self._state_path = state_path
+		self._page_size = page_size
+		self._overlap_sec = overlap_sec
+		self._reconcile_sec = reconcile_sec
+		self._state: dict[str, dict[str, Any]] = self._load_state()
+
+	def _load_state(self) -> dict[str, dict[str, Any]]:
+		if not self._state_path or not os.path.exists(self._state_path):
+			return {}
+		with open(self._state_path, encoding="utf-8") as f:
+			return json.load(f)
+
+	def _save_state(self) -> None:
+		if not self._state_path:
+			return
+		tmp_path = f"{self._state_path}.tmp"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self._state, f)
+		os.replace(tmp_path, self._state_path)
+
+	def sync(self, tables: tuple[str, ...] = SYNC_TABLES, reconcile: Optional[bool] = None) -> dict[str, dict[str, int]]:
+		return {table: self.sync_table(table, reconcile) for table in tables}
+
+	def sync_table(self, table: str, reconcile: Optional[bool] = None) -> dict[str, int]:
+		"""
+		1テーブル分を同期
+
+		Args:
+			reconcile: 削除の突き合わせを行うか（None なら前回から SYNC_RECONCILE_SEC 秒経過時のみ）
+
+		Returns:
+			{"appended": 追加した行数, "updated": 上書きした行数, "deleted": 空にした行数}
+		"""
+		spec = EXPORT_SPECS[table]
+		state = self._state.get(table)
+		if state is None:
+			# 同期状態がなければシートを作り直してヘッダーから書く
+			self._backend.clear(table)
+			self._backend.append_rows(table, [spec.column_names])
+			state = {"watermark": None, "rows": {}, "last_row": 1}
+			self._state[table] = state
+			self._save_state()
+
+		appended = updated = 0
+		watermark = state["watermark"]
+		for page in iter_changed_rows(spec, state["watermark"], self._page_size, self._overlap_sec):
+			new_rows: list[tuple[str, list[Any]]] = []
+			updates: list[tuple[int, list[Any]]] = []
+			for row in page:
+				values = [_cell(row.get(name)) for name in spec.column_names]
+				row_number = state["rows"].get(row["id"])
+				if row_number:
+					updates.append((row_number, values))
+				else:
+					new_rows.append((row["id"], values))
+
+			if updates:
+				self._backend.update_rows(table, updates)
+				updated += len(updates)
+			if new_rows:
+				first = self._backend.append_rows(table, [values for _, values in new_rows])
+				for offset, (row_id, _) in enumerate(new_rows):
+					state["rows"][row_id] = first + offset
+				state["last_row"] = first + len(new_rows) - 1
+				appended += len(new_rows)
+
+			# 読み直した範囲の行で透かしを戻さない
+			last = [page[-1]["updated_at"], page[-1]["id"]]
+			if _watermark_key(last) > _watermark_key(watermark):
+				watermark = state["watermark"] = last
+			self._save_state()
+
+		deleted = 0
+		if reconcile or (reconcile is None and time.time() - state.get("reconciled_at", 0) >= self._reconcile_sec):
+			deleted = self._reconcile_deletes(table, spec, state)
+		return {"appended": appended, "updated": updated, "deleted": deleted}
+
+	def _reconcile_deletes(self, table: str, spec: ExportSpec, state: dict[str, Any]) -> int:
+		"""DB にない id のシート行を空にし、行番号の対応から除く"""
+		existing = set(iter_row_ids(table))
+		removed = [row_id for row_id in state["rows"] if row_id not in existing]
+		if removed:
+			blank = [""] * len(spec.column_names)
+			self._backend.update_rows(table, [(state["rows"][row_id], blank) for row_id in removed])
+			for row_id in removed:
+				del state["rows"][row_id]
+		state["reconciled_at"] = time.time()
+		self._save_state()
+		return len(removed)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+	parser = argparse.ArgumentParser(prog="python -m google.sync", description="works / attendance をスプレッドシートへ差分同期")
+	parser.add_argument("--tables", nargs="+", choices=SYNC_TABLES, default=list(SYNC_TABLES))
+	parser.add_argument("--state", default=os.getenv("SHEETS_SYNC_STATE", ".sheets_sync_state.json"), help="同期状態ファイル")
+	parser.add_argument("--memory", action="store_true", help="メモリ上のバックエンドに書き込む（状態は保存しない）")
+	parser.add_argument("--reconcile", action="store_true", help="前回からの経過時間によらず削除された行を突き合わせる")
+	args = parser.parse_args(argv)
+
+	if args.memory:
+		sync = SheetsSync(MemorySheetsBackend())
+	else:
+		sync = SheetsSync(GspreadSheetsBackend(), args.state)
+	for table, counts in sync.sync(tuple(args.tables), True if args.reconcile else None).items():
+		print(f"{table}: {counts['appended']} appended, {counts['updated']} updated, {counts['deleted']} deleted", file=sys.stderr)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
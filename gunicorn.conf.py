@@ -0,0 +1,55 @@
+"""
+gunicorn 設定
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+ワーカー数・スレッド数などは環境変数で調整する。
+SIGHUP でワーカーを順次入れ替える（graceful restart）。終了するワーカーは
+ack 済みのバックグラウンド操作を graceful_timeout まで処理してから終了する。
+既定は 1 ワーカー × 複数スレッド（複数ワーカー時の注意は docs/setup.md を参照）。
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '3001')}"
+
+# プロセス数 × スレッド数が同時に処理できるリクエスト数
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# Slack は3秒以内の応答を求めるため、ハングしたワーカーは早めに入れ替える
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "20"))
+keepalive = 5
+
+# 一定リクエストごとにワーカーを再起動（0 なら無効）。再起動のたびにプロセス内の
+# 集計・索引を読み込み直すため、既定では無効
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# ワーカーごとに create_app() を呼ぶ（Supabase クライアントや索引はワーカー内で初期化）
+preload_app = False
+
+accesslog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def post_fork(server, worker):
+    # preload_app を有効にした場合も、親プロセスの接続やスレッドを引き継がない
+    from db.supabase_client import reset_client
+    reset_client()
+
+    if preload_app:
+        from app import start_background_services
+        start_background_services()
+
+
+def worker_exit(server, worker):
+    # ack 済みでキューに残っている操作を処理してから終了する
+    # （graceful_timeout を過ぎると master に強制終了されるため少し手前で打ち切る）
+    import time
+    from handlers.background import action_executor, export_executor
+    deadline = time.monotonic() + max(1, graceful_timeout - 2)
+    action_executor.shutdown(deadline - time.monotonic())
+    export_executor.shutdown(max(0.0, deadline - time.monotonic()))
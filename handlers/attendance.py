@@ -4,7 +4,48 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict
 
 from boltApp import bolt_app
-from db.repository import upsert_attendance, get_users, get_attendance_between_tue_fri
+from db.repository import upsert_attendance, get_users, get_attendance_between, USER_NAME_COLUMNS
+from handlers.slack_cache import get_display_name
+from handlers.background import run_in_background
+from display.templates import BlockTemplate
+
+
+_ATTENDANCE_FORM = BlockTemplate([
+    {
+        "type": "header",
+        "text": {"type": "plain_text", "text": "出勤予定を選択", "emoji": True},
+    },
+    {
+        "type": "actions",
+        "elements": [
+            {
+                "type": "datepicker",
+                "initial_date": "{{initial_date}}",
+                "placeholder": {"type": "plain_text", "text": "日付を選択", "emoji": True},
+                "action_id": "attendance_datepicker",
+            },
+        ],
+    },
+    {
+        "type": "actions",
+        "elements": [
+            {
+                "type": "timepicker",
+                "initial_time": "{{initial_time}}",
+                "placeholder": {"type": "plain_text", "text": "開始時刻を選択", "emoji": True},
+                "action_id": "attendance_timepicker",
+            },
+        ],
+    },
+    {
+        "type": "actions",
+        "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "出勤"}, "style": "primary", "action_id": "attend_yes"},
+            {"type": "button", "text": {"type": "plain_text", "text": "休み"}, "style": "danger", "action_id": "attend_no"},
+            {"type": "button", "text": {"type": "plain_text", "text": "キャンセル"}, "action_id": "attend_cancel"},
+        ],
+    },
+])
 
 
 def prompt_attendance(say, values=None, error_message=None) -> None:
@@ -23,67 +64,33 @@ def prompt_attendance(say, values=None, error_message=None) -> None:
                 elif action_id == "attendance_timepicker" and payload.get("selected_time"):
                     initial_time = payload.get("selected_time")
 
-    blocks = [
-        {
-            "type": "header",
-            "text": {"type": "plain_text", "text": "出勤予定を選択", "emoji": True},
-        }
-    ]
+    blocks = _ATTENDANCE_FORM.render(initial_date=initial_date, initial_time=initial_time)
 
-    # エラーメッセージがある場合は表示
+    # エラーメッセージがある場合はヘッダーの下に表示
     if error_message:
-        blocks.append({
+        blocks.insert(1, {
             "type": "section",
             "text": {"type": "mrkdwn", "text": f"❌ {error_message}"}
         })
 
-    blocks.extend([
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "datepicker",
-                    "initial_date": initial_date,
-                    "placeholder": {"type": "plain_text", "text": "日付を選択", "emoji": True},
-                    "action_id": "attendance_datepicker",
-                },
-            ],
-        },
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "timepicker",
-                    "initial_time": initial_time,
-                    "placeholder": {"type": "plain_text", "text": "開始時刻を選択", "emoji": True},
-                    "action_id": "attendance_timepicker",
-                },
-            ],
-        },
-        {
-            "type": "actions",
-            "elements": [
-                {"type": "button", "text": {"type": "plain_text", "text": "出勤"}, "style": "primary", "action_id": "attend_yes"},
-                {"type": "button", "text": {"type": "plain_text", "text": "休み"}, "style": "danger", "action_id": "attend_no"},
-                {"type": "button", "text": {"type": "plain_text", "text": "キャンセル"}, "action_id": "attend_cancel"},
-            ],
-        },
-    ])
     say(blocks=blocks, text="出勤予定の選択")
 
 
 @bolt_app.action("attend_yes")
+@run_in_background
 def attend_yes(ack, body, say, client):  # type: ignore[no-redef]
     ack()
     _save_attendance(True, body, say, client)
 
 
 @bolt_app.action("attend_no")
+@run_in_background
 def attend_no(ack, body, say, client):  # type: ignore[no-redef]
     ack()
     _save_attendance(False, body, say, client)
 
 @bolt_app.action("attend_cancel")
+@run_in_background
 def attend_cancel(ack, body, say):
     ack()
     say("出勤予定をキャンセルしました。")
@@ -92,13 +99,7 @@ def attend_cancel(ack, body, say):
 
 def _save_attendance(is_attend: bool, body, say, client) -> None:
     user_slack_id = body.get("user", {}).get("id")
-    display_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            display_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    display_name = get_display_name(client, user_slack_id)
 
     from db.repository import get_or_create_user
 
@@ -151,29 +152,17 @@ def _save_attendance(is_attend: bool, body, say, client) -> None:
 def show_attendance_overview(say, client=None) -> None:
     try:
         now = datetime.now(timezone.utc)
-        users = get_users()
+        users = get_users(USER_NAME_COLUMNS)
         user_map: Dict[str, str] = {u.id: u.name for u in users}
-        rows = get_attendance_between_tue_fri(now)
+        target_dates, rows = get_attendance_between(now)
 
-        # 1か月分の火曜日と金曜日の日付を生成（今日以降のみ）
         from collections import defaultdict
 
         by_date: Dict[str, Dict[str, str]] = defaultdict(dict)  # date -> user_id -> status
 
-        # 1か月分（約30日）の火曜日と金曜日を生成
-        jst_tz = timezone(timedelta(hours=9))
-        cur = now.astimezone(jst_tz).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # 今日から未来1か月分のみをカバー（過去は表示しない）
-        start_date = cur  # 今日から開始
-        end_date = cur + timedelta(days=30)  # 1か月先まで
-
-        current = start_date
-        while current <= end_date:
-            if current.weekday() in (1, 4):  # 火曜日=1, 金曜日=4
-                key = f"{current.year:04d}-{current.month:02d}-{current.day:02d}"
-                by_date[key] = {}
-            current += timedelta(days=1)
+        # 今日から1か月分（約30日）の火曜日と金曜日（過去は表示しない）
+        for d in target_dates:
+            by_date[d.strftime("%Y-%m-%d")] = {}
 
         # 取得したデータをマッピング
         for r in rows:
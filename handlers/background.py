@@ -0,0 +1,196 @@
+"""
+アクションハンドラーのバックグラウンド実行
+
+ack() を即座に返し、Supabase や Slack への I/O はワーカースレッドで処理する。
+同じユーザーの操作は同じワーカーに割り当てて順序を保ち、
+キューが詰まった場合は呼び出し元スレッドで実行して流入を抑える（バックプレッシャー）。
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedExecutor:
+    """キーごとに実行順序を保証する固定長のワーカープール"""
+
+    def __init__(self, workers: int, queue_size: int, submit_timeout: float, name: str = "action"):
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._submit_timeout = submit_timeout
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "inline": 0}
+        self._max_depth = 0
+        self._queue_size = queue_size
+        self._pid: Optional[int] = None
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+        self._name = name
+
+    def _ensure_started(self) -> None:
+        # スレッドは fork 先に引き継がれないため、プロセスが変わったら作り直す
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._queues = [queue.Queue(maxsize=self._queue_size) for _ in self._queues]
+            self._threads = [
+                threading.Thread(target=self._run, args=(q,), name=f"{self._name}-worker-{i}", daemon=True)
+                for i, q in enumerate(self._queues)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    def _queue_for(self, key: Optional[str]) -> queue.Queue:
+        if key is None:
+            index = next(self._round_robin)
+        else:
+            index = zlib.crc32(key.encode("utf-8"))
+        return self._queues[index % len(self._queues)]
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _execute(self, func: Callable[..., Any], kwargs: dict[str, Any]) -> None:
+        try:
+            func(**kwargs)
+            self._count("completed")
+        except Exception as e:
+            self._count("failed")
+            logger.error(f"Background action {getattr(func, '__name__', func)} failed: {e}", exc_info=True)
+
+    def _run(self, q: queue.Queue) -> None:
+        while True:
+            item = q.get()
+            try:
+                if item is None:
+                    return
+                func, kwargs = item
+                self._execute(func, kwargs)
+            finally:
+                q.task_done()
+
+    def submit(self, key: Optional[str], func: Callable[..., Any], **kwargs: Any) -> None:
+        """
+        func(**kwargs) をキーに対応するワーカーで実行
+
+        キューが submit_timeout 秒以内に空かなければ呼び出し元で実行する。
+        shutdown() 後は受け付けずに呼び出し元で実行する。
+        """
+        if self._closed:
+            self._count("inline")
+            self._execute(func, kwargs)
+            return
+        self._ensure_started()
+        q = self._queue_for(key)
+        self._count("submitted")
+        try:
+            q.put((func, kwargs), timeout=self._submit_timeout)
+        except queue.Full:
+            self._count("inline")
+            logger.warning(f"Action queue full; running {getattr(func, '__name__', func)} inline")
+            self._execute(func, kwargs)
+            return
+        with self._lock:
+            self._max_depth = max(self._max_depth, q.qsize())
+
+    def shutdown(self, timeout: float) -> bool:
+        """
+        新しい操作の受け付けを止め、キューに残った操作を最大 timeout 秒まで処理して待つ
+
+        ワーカースレッドはデーモンスレッドのため、プロセス終了前に呼ばないと
+        ack 済みの操作が実行されずに失われる。
+
+        Returns:
+            すべての操作を処理し終えたか
+        """
+        self._closed = True
+        if self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        for q in self._queues:
+            # 残っている操作の後ろに終了の目印を置く（満杯なら期限まで空くのを待つ）
+            try:
+                q.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                pass
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        remaining = sum(q.qsize() for q in self._queues)
+        if remaining or any(thread.is_alive() for thread in self._threads):
+            logger.warning(f"Action executor shutdown timed out; unfinished actions are dropped (queue depth {remaining})")
+            return False
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """キュー長と処理件数"""
+        depths = [q.qsize() for q in self._queues]
+        with self._lock:
+            return {
+                "workers": len(self._queues),
+                "queue_depth": sum(depths),
+                "queue_depths": depths,
+                "max_queue_depth": self._max_depth,
+                **self._counters,
+            }
+
+
+action_executor = KeyedExecutor(
+    workers=int(os.getenv("ACTION_WORKERS", "8")),
+    queue_size=int(os.getenv("ACTION_QUEUE_SIZE", "100")),
+    submit_timeout=float(os.getenv("ACTION_SUBMIT_TIMEOUT", "0.5")),
+)
+
+# エクスポートは数十秒かかることがあるため、アクションとは別の少数のワーカーで実行する
+export_executor = KeyedExecutor(
+    workers=int(os.getenv("EXPORT_WORKERS", "2")),
+    queue_size=int(os.getenv("EXPORT_QUEUE_SIZE", "20")),
+    submit_timeout=float(os.getenv("ACTION_SUBMIT_TIMEOUT", "0.5")),
+    name="export",
+)
+
+
+def _ordering_key(body: Optional[dict[str, Any]]) -> Optional[str]:
+    if not isinstance(body, dict):
+        return None
+    return (
+        (body.get("user") or {}).get("id")
+        or (body.get("event") or {}).get("user")
+        or (body.get("channel") or {}).get("id")
+    )
+
+
+def _noop_ack(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+def run_in_background(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Bolt のリスナーを ack 後にバックグラウンド実行するデコレーター
+
+    @bolt_app.action(...) の直下に付ける。Bolt は functools.wraps を辿って
+    元の関数の引数名で値を注入するため、リスナー側の引数はそのまま使える。
+    """
+    @functools.wraps(func)
+    def wrapper(**kwargs: Any) -> None:
+        ack = kwargs.get("ack")
+        if ack is not None:
+            ack()
+            kwargs["ack"] = _noop_ack
+        action_executor.submit(_ordering_key(kwargs.get("body")), func, **kwargs)
+
+    return wrapper
@@ -0,0 +1,96 @@
+"""
+チャンネルメッセージの非同期処理（asyncio サーバーモード用）
+
+handlers.handle_channel_message と同じコマンドを AsyncWebClient と
+非同期 Supabase クライアントで処理する。
+"""
+
+from datetime import datetime, timezone, timedelta
+
+from db import async_repository
+from handlers.commands import CommandRouter
+from handlers.slack_cache import async_get_channel_name, async_get_user_name
+
+from .handlers import CHANNEL_COMMAND_ALIASES
+from .menu import create_channel_menu_blocks
+from .memo import create_memo_list_blocks
+
+
+async def _show_channel_menu(event, args, say, client):
+    await say(text="📱 チャンネルメニュー", blocks=create_channel_menu_blocks())
+
+
+async def _create_memo(event, memo_content, say, client):
+    """メモ作成（!memo, !m, !メモ コマンド）"""
+    try:
+        channel_id = event.get("channel")
+        user_id = event.get("user")
+
+        memo_data = {
+            "channel_id": channel_id,
+            "channel_name": await async_get_channel_name(client, channel_id),
+            "user_id": user_id,
+            "user_name": await async_get_user_name(client, user_id),
+            "message": memo_content,
+            "message_ts": event.get("ts"),
+            "thread_ts": None,
+            "permalink": None,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+
+        if await async_repository.save_channel_memo(memo_data):
+            await say(text=f"📝 メモを作成しました:\n> {memo_content}")
+        else:
+            await say(text="❌ メモの作成に失敗しました")
+    except Exception as e:
+        await say(text="❌ メモの作成中にエラーが発生しました")
+
+
+async def _create_task(event, task_name, say, client):
+    """タスク作成（!task コマンド）"""
+    try:
+        # 日本時間（JST）で作成時刻を設定
+        jst_now = datetime.now(timezone(timedelta(hours=9)))
+        task_data = {
+            "channel_id": event.get("channel"),
+            "user_id": event.get("user"),
+            "task_name": task_name,
+            "status": "pending",
+            "created_at": jst_now.isoformat()
+        }
+
+        if await async_repository.save_channel_task(task_data):
+            await say(text=f"✅ タスク「{task_name}」を作成しました")
+        else:
+            await say(text="❌ タスクの作成に失敗しました")
+    except Exception as e:
+        await say(text="❌ タスクの作成中にエラーが発生しました")
+
+
+async def _show_memo_list(event, args, say, client):
+    """メモ一覧表示（!memo コマンド）"""
+    try:
+        memos, next_cursor, prev_cursor = await async_repository.get_channel_memos_page(event.get("channel"))
+        await say(
+            text="📝 メモ一覧",
+            blocks=create_memo_list_blocks(memos, 1, next_cursor, prev_cursor),
+            thread_ts=event.get("ts")
+        )
+    except Exception as e:
+        await say(text="❌ メモ一覧の表示中にエラーが発生しました")
+
+
+async_channel_commands = CommandRouter()
+async_channel_commands.add(CHANNEL_COMMAND_ALIASES["menu"], _show_channel_menu)
+async_channel_commands.add(CHANNEL_COMMAND_ALIASES["memo"], _create_memo, with_args=True)
+async_channel_commands.add(CHANNEL_COMMAND_ALIASES["memo_list"], _show_memo_list)
+async_channel_commands.add(CHANNEL_COMMAND_ALIASES["task"], _create_task, with_args=True)
+
+
+async def handle_channel_message_async(event, say, client, logger):
+    """チャンネルメッセージの統一処理（非同期版）"""
+    route = async_channel_commands.resolve(event.get("text", ""))
+    if route is None:
+        return
+    handler, args = route
+    await handler(event, args, say, client)
@@ -3,7 +3,8 @@
 """
 
 import re
-from typing import Dict, Any
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional
 
 from slack_bolt import App
 from slack_sdk import WebClient
@@ -12,18 +13,23 @@ from slack_sdk.errors import SlackApiError
 from db.repository import (
     search_channel_memos,
     get_channel_memo_stats,
-    get_channel_tasks,
+    get_channel_tasks_page,
+    count_channel_tasks,
     get_recent_channel_memos,
     save_channel_task,
-    update_task_status,
+    toggle_task_status,
     delete_task,
-    get_all_channel_memos,
+    get_channel_memos_page,
     get_channel_memo_by_id,
     update_channel_memo,
     delete_channel_memo,
     save_channel_memo
 )
 
+from handlers.commands import CommandRouter
+from handlers.slack_cache import get_channel_name, get_user_name
+from handlers.background import action_executor, run_in_background
+
 from .menu import (
     create_channel_menu_blocks,
     create_channel_help_blocks,
@@ -37,7 +43,8 @@ from .memo import (
     create_recent_memos_blocks,
     create_memo_list_blocks,
     create_memo_edit_modal_blocks,
-    create_memo_create_form_blocks
+    create_memo_create_form_blocks,
+    parse_page_value
 )
 
 from .tasks import (
@@ -47,124 +54,141 @@ from .tasks import (
 )
 
 
-def handle_channel_message(event, body, say, client, logger):
-    """チャンネルメッセージの統一処理"""
-    text = event.get("text", "").strip()
-
-    # メニュー表示
-    if re.match(r"^(メニュー|めにゅー|menu)$", text, re.IGNORECASE):
-        try:
-            blocks = create_channel_menu_blocks()
-            say(
-                text="📱 チャンネルメニュー",
-                blocks=blocks
-            )
-        except Exception as e:
-            say(text="❌ メニューの表示中にエラーが発生しました")
-
-    # メモ作成（!memo, !m, !メモ コマンド）
-    elif re.match(r"^(!memo|!m|!メモ)\s+(.+)", text, re.IGNORECASE):
-        try:
-            # メモ内容を抽出
-            memo_match = re.match(r"^(!memo|!m|!メモ)\s+(.+)", text, re.IGNORECASE)
-            if memo_match:
-                memo_content = memo_match.group(2).strip()
-                channel_id = event.get("channel")
-                user_id = event.get("user")
-                message_ts = event.get("ts")
-
-                # ユーザー情報を取得
-                try:
-                    user_info = client.users_info(user=user_id)
-                    user_profile = user_info.get("user", {}).get("profile", {})
-                    user_name = (
-                        user_profile.get("real_name") or
-                        user_profile.get("display_name") or
-                        user_info.get("user", {}).get("name", "Unknown User")
-                    )
-                except Exception as e:
-                    user_name = "Unknown User"
-
-                # チャンネル情報を取得
-                try:
-                    channel_info = client.conversations_info(channel=channel_id)
-                    channel_name = channel_info.get("channel", {}).get("name", "unknown")
-                except Exception as e:
-                    channel_name = "unknown"
-
-                # メモデータを作成
-                from datetime import datetime, timezone
-                memo_data = {
-                    "channel_id": channel_id,
-                    "channel_name": channel_name,
-                    "user_id": user_id,
-                    "user_name": user_name,
-                    "message": memo_content,
-                    "message_ts": message_ts,
-                    "thread_ts": None,
-                    "permalink": None,
-                    "created_at": datetime.now(timezone.utc).isoformat()
-                }
-
-                # メモを保存
-                saved_memo = save_channel_memo(memo_data)
-
-                if saved_memo:
-                    say(text=f"📝 メモを作成しました:\n> {memo_content}")
-                else:
-                    say(text="❌ メモの作成に失敗しました")
-        except Exception as e:
-            say(text="❌ メモの作成中にエラーが発生しました")
-
-    # タスク作成（!task コマンド）
-    elif re.match(r"^!task\s+(.+)", text, re.IGNORECASE):
-        try:
-            # タスク名を抽出
-            task_match = re.match(r"^!task\s+(.+)", text, re.IGNORECASE)
-            if task_match:
-                task_name = task_match.group(1).strip()
-                channel_id = event.get("channel")
-                user_id = event.get("user")
-
-                # タスクデータを作成
-                from datetime import datetime, timezone, timedelta
-                # 日本時間（JST）で作成時刻を設定
-                jst_now = datetime.now(timezone(timedelta(hours=9)))
-                task_data = {
-                    "channel_id": channel_id,
-                    "user_id": user_id,
-                    "task_name": task_name,
-                    "status": "pending",
-                    "created_at": jst_now.isoformat()
-                }
-
-                # タスクを保存
-                saved_task = save_channel_task(task_data)
-
-                if saved_task:
-                    say(text=f"✅ タスク「{task_name}」を作成しました")
-                else:
-                    say(text="❌ タスクの作成に失敗しました")
-        except Exception as e:
-            say(text="❌ タスクの作成中にエラーが発生しました")
+# チャンネルコマンドのエイリアス（先頭語、大文字/小文字は区別しない）
+CHANNEL_COMMAND_ALIASES = {
+    "menu": ("メニュー", "めにゅー", "menu"),
+    "memo": ("!memo", "!m", "!メモ"),
+    "memo_list": ("!memo",),
+    "task": ("!task",),
+}
+
+
+def _show_channel_menu(event, args, say, client):
+    try:
+        blocks = create_channel_menu_blocks()
+        say(
+            text="📱 チャンネルメニュー",
+            blocks=blocks
+        )
+    except Exception as e:
+        say(text="❌ メニューの表示中にエラーが発生しました")
+
+
+def _create_memo(event, memo_content, say, client):
+    """メモ作成（!memo, !m, !メモ コマンド）"""
+    try:
+        channel_id = event.get("channel")
+        user_id = event.get("user")
+        message_ts = event.get("ts")
+
+        # ユーザー情報を取得
+        user_name = get_user_name(client, user_id)
+
+        # チャンネル情報を取得
+        channel_name = get_channel_name(client, channel_id)
+
+        # メモデータを作成
+        memo_data = {
+            "channel_id": channel_id,
+            "channel_name": channel_name,
+            "user_id": user_id,
+            "user_name": user_name,
+            "message": memo_content,
+            "message_ts": message_ts,
+            "thread_ts": None,
+            "permalink": None,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+
+        # メモを保存
+        saved_memo = save_channel_memo(memo_data)
+
+        if saved_memo:
+            say(text=f"📝 メモを作成しました:\n> {memo_content}")
+        else:
+            say(text="❌ メモの作成に失敗しました")
+    except Exception as e:
+        say(text="❌ メモの作成中にエラーが発生しました")
+
+
+def _create_task(event, task_name, say, client):
+    """タスク作成（!task コマンド）"""
+    try:
+        # 日本時間（JST）で作成時刻を設定
+        jst_now = datetime.now(timezone(timedelta(hours=9)))
+        task_data = {
+            "channel_id": event.get("channel"),
+            "user_id": event.get("user"),
+            "task_name": task_name,
+            "status": "pending",
+            "created_at": jst_now.isoformat()
+        }
+
+        # タスクを保存
+        saved_task = save_channel_task(task_data)
+
+        if saved_task:
+            say(text=f"✅ タスク「{task_name}」を作成しました")
+        else:
+            say(text="❌ タスクの作成に失敗しました")
+    except Exception as e:
+        say(text="❌ タスクの作成中にエラーが発生しました")
+
+
+def _show_memo_list(event, args, say, client):
+    """メモ一覧表示（!memo コマンド）"""
+    try:
+        channel_id = event.get("channel")
+        memos, next_cursor, prev_cursor = get_channel_memos_page(channel_id)
+
+        blocks = create_memo_list_blocks(memos, 1, next_cursor, prev_cursor)
+
+        # スレッドに返信する形で表示
+        thread_ts = event.get("ts")  # 元メッセージのタイムスタンプ
+        say(
+            text="📝 メモ一覧",
+            blocks=blocks,
+            thread_ts=thread_ts
+        )
+    except Exception as e:
+        say(text="❌ メモ一覧の表示中にエラーが発生しました")
+
+
+TASK_LIST_FILTERS = ("all", "pending", "completed")
+
+
+def _task_list_blocks(
+    channel_id: str,
+    filter_status: str,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    direction: str = "next"
+) -> list[Dict[str, Any]]:
+    """フィルターのステータス条件と件数をクエリで取得してタスク一覧のブロックを作成"""
+    status = filter_status if filter_status in ("pending", "completed") else None
+    tasks, next_cursor, prev_cursor = get_channel_tasks_page(channel_id, cursor, direction, status=status)
+    total_count = count_channel_tasks(channel_id)
+    filtered_count = count_channel_tasks(channel_id, status) if status else total_count
+    return create_task_list_blocks(
+        tasks, filter_status, page, next_cursor, prev_cursor, filtered_count, total_count
+    )
+
+
+channel_commands = CommandRouter()
+channel_commands.add(CHANNEL_COMMAND_ALIASES["menu"], _show_channel_menu)
+channel_commands.add(CHANNEL_COMMAND_ALIASES["memo"], _create_memo, with_args=True)
+channel_commands.add(CHANNEL_COMMAND_ALIASES["memo_list"], _show_memo_list)
+channel_commands.add(CHANNEL_COMMAND_ALIASES["task"], _create_task, with_args=True)
 
-    # メモ一覧表示（!memo コマンド）
-    elif re.match(r"^!memo\s*$", text, re.IGNORECASE):
-        try:
-            channel_id = event.get("channel")
-            memos = get_all_channel_memos(channel_id, limit=50)
 
-            blocks = create_memo_list_blocks(memos)
+def handle_channel_message(event, body, say, client, logger):
+    """チャンネルメッセージの統一処理（コマンド以外の発言は何もしない）"""
+    route = channel_commands.resolve(event.get("text", ""))
+    if route is None:
+        return
+    handler, args = route
+    handler(event, args, say, client)
 
-            # スレッドに返信する形で表示
-            thread_ts = event.get("ts")  # 元メッセージのタイムスタンプ
-            say(
-                text="📝 メモ一覧",
-                blocks=blocks,
-                thread_ts=thread_ts
-            )
-        except Exception as e:
-            say(text="❌ メモ一覧の表示中にエラーが発生しました")
 
 def register_channel_handlers(app: App):
     """チャンネル機能のハンドラーを登録"""
@@ -174,6 +198,7 @@ def register_channel_handlers(app: App):
 
     # メニューボタンアクション
     @app.action("show_channel_menu")
+    @run_in_background
     def handle_show_channel_menu(ack, body, say, client: WebClient):
         """メニューを表示"""
         ack()
@@ -187,6 +212,7 @@ def register_channel_handlers(app: App):
             say(text="❌ メニューの表示中にエラーが発生しました")
 
     @app.action("show_memo_management")
+    @run_in_background
     def handle_show_memo_management(ack, body, say, client: WebClient):
         """メモ管理を表示"""
         ack()
@@ -201,6 +227,7 @@ def register_channel_handlers(app: App):
 
     # ヘルプ表示
     @app.action("show_channel_help")
+    @run_in_background
     def handle_show_channel_help(ack, body, say, client: WebClient):
         """ヘルプを表示"""
         ack()
@@ -215,6 +242,7 @@ def register_channel_handlers(app: App):
 
     # メモ作成フォーム表示
     @app.action("show_memo_create")
+    @run_in_background
     def handle_show_memo_create(ack, body, say, client: WebClient):
         """メモ作成フォームを表示"""
         ack()
@@ -229,6 +257,7 @@ def register_channel_handlers(app: App):
 
     # メモ検索フォーム表示
     @app.action("show_memo_search")
+    @run_in_background
     def handle_show_memo_search(ack, body, say, client: WebClient):
         """メモ検索フォームを表示"""
         ack()
@@ -243,6 +272,7 @@ def register_channel_handlers(app: App):
 
     # メモ検索実行
     @app.action("execute_memo_search")
+    @run_in_background
     def handle_execute_memo_search(ack, body, say, client: WebClient):
         """メモ検索を実行"""
         ack()
@@ -287,6 +317,7 @@ def register_channel_handlers(app: App):
 
     # メモ作成実行
     @app.action("execute_memo_create")
+    @run_in_background
     def handle_execute_memo_create(ack, body, say, client: WebClient):
         """メモ作成を実行"""
         ack()
@@ -309,23 +340,10 @@ def register_channel_handlers(app: App):
             user_id = body["user"]["id"]
 
             # ユーザー情報を取得
-            try:
-                user_info = client.users_info(user=user_id)
-                user_profile = user_info.get("user", {}).get("profile", {})
-                user_name = (
-                    user_profile.get("real_name") or
-                    user_profile.get("display_name") or
-                    user_info.get("user", {}).get("name", "Unknown User")
-                )
-            except Exception as e:
-                user_name = "Unknown User"
+            user_name = get_user_name(client, user_id)
 
             # チャンネル情報を取得
-            try:
-                channel_info = client.conversations_info(channel=channel_id)
-                channel_name = channel_info.get("channel", {}).get("name", "unknown")
-            except Exception as e:
-                channel_name = "unknown"
+            channel_name = get_channel_name(client, channel_id)
 
             # メモデータを作成
             from datetime import datetime, timezone
@@ -358,14 +376,15 @@ def register_channel_handlers(app: App):
 
     # メモ一覧表示
     @app.action("show_memo_list")
+    @run_in_background
     def handle_show_memo_list(ack, body, say, client: WebClient):
         """メモ一覧を表示"""
         ack()
         try:
             channel_id = body["channel"]["id"]
-            memos = get_all_channel_memos(channel_id, limit=50)
+            memos, next_cursor, prev_cursor = get_channel_memos_page(channel_id)
 
-            blocks = create_memo_list_blocks(memos)
+            blocks = create_memo_list_blocks(memos, 1, next_cursor, prev_cursor)
             say(
                 text="📝 メモ一覧",
                 blocks=blocks
@@ -374,8 +393,30 @@ def register_channel_handlers(app: App):
         except Exception as e:
             say(text="❌ メモ一覧の表示中にエラーが発生しました")
 
+    # メモ一覧のページ送り
+    @app.action(re.compile(r"memo_list_page_(prev|next)"))
+    @run_in_background
+    def handle_memo_list_page(ack, body, say, client: WebClient):
+        """メモ一覧の前後のページを表示"""
+        ack()
+        try:
+            channel_id = body["channel"]["id"]
+            direction, page, cursor = parse_page_value(body["actions"][0]["value"])
+            memos, next_cursor, prev_cursor = get_channel_memos_page(channel_id, cursor, direction)
+
+            blocks = create_memo_list_blocks(memos, page, next_cursor, prev_cursor)
+            say(
+                text="📝 メモ一覧",
+                blocks=blocks,
+                thread_ts=body.get("message", {}).get("thread_ts")
+            )
+
+        except Exception as e:
+            say(text="❌ メモ一覧の表示中にエラーが発生しました")
+
     # メモ統計表示
     @app.action("show_memo_stats")
+    @run_in_background
     def handle_show_memo_stats(ack, body, say, client: WebClient):
         """メモ統計を表示（ユーザーランキング含む）"""
         ack()
@@ -399,6 +440,7 @@ def register_channel_handlers(app: App):
 
     # タスク管理メニュー表示
     @app.action("show_task_management")
+    @run_in_background
     def handle_show_task_management(ack, body, say, client: WebClient):
         """タスク管理メニューを表示"""
         ack()
@@ -413,14 +455,13 @@ def register_channel_handlers(app: App):
 
     # タスク一覧表示（全て）
     @app.action("show_task_list")
+    @run_in_background
     def handle_show_task_list(ack, body, say, client: WebClient):
         """タスク一覧を表示（全て）"""
         ack()
         try:
             channel_id = body["channel"]["id"]
-            tasks = get_channel_tasks(channel_id)
-
-            blocks = create_task_list_blocks(tasks, "all")
+            blocks = _task_list_blocks(channel_id, "all")
             say(
                 text="📋 全てのタスク",
                 blocks=blocks
@@ -430,14 +471,13 @@ def register_channel_handlers(app: App):
 
     # タスク一覧表示（全て）
     @app.action("show_task_list_all")
+    @run_in_background
     def handle_show_task_list_all(ack, body, say, client: WebClient):
         """タスク一覧を表示（全て）"""
         ack()
         try:
             channel_id = body["channel"]["id"]
-            tasks = get_channel_tasks(channel_id)
-
-            blocks = create_task_list_blocks(tasks, "all")
+            blocks = _task_list_blocks(channel_id, "all")
             say(
                 text="📋 全てのタスク",
                 blocks=blocks
@@ -447,14 +487,13 @@ def register_channel_handlers(app: App):
 
     # タスク一覧表示（未完了）
     @app.action("show_task_list_pending")
+    @run_in_background
     def handle_show_task_list_pending(ack, body, say, client: WebClient):
         """タスク一覧を表示（未完了）"""
         ack()
         try:
             channel_id = body["channel"]["id"]
-            tasks = get_channel_tasks(channel_id)
-
-            blocks = create_task_list_blocks(tasks, "pending")
+            blocks = _task_list_blocks(channel_id, "pending")
             say(
                 text="📋 未完了タスク",
                 blocks=blocks
@@ -464,14 +503,13 @@ def register_channel_handlers(app: App):
 
     # タスク一覧表示（完了済み）
     @app.action("show_task_list_completed")
+    @run_in_background
     def handle_show_task_list_completed(ack, body, say, client: WebClient):
         """タスク一覧を表示（完了済み）"""
         ack()
         try:
             channel_id = body["channel"]["id"]
-            tasks = get_channel_tasks(channel_id)
-
-            blocks = create_task_list_blocks(tasks, "completed")
+            blocks = _task_list_blocks(channel_id, "completed")
             say(
                 text="📋 完了済みタスク",
                 blocks=blocks
@@ -479,8 +517,30 @@ def register_channel_handlers(app: App):
         except Exception as e:
             say(text="❌ 完了済みタスク一覧の表示中にエラーが発生しました")
 
+    # タスク一覧のページ送り
+    @app.action(re.compile(r"task_list_page_(prev|next)"))
+    @run_in_background
+    def handle_task_list_page(ack, body, say, client: WebClient):
+        """タスク一覧の前後のページを表示"""
+        ack()
+        try:
+            channel_id = body["channel"]["id"]
+            filter_status, value = body["actions"][0]["value"].split(":", 1)
+            direction, page, cursor = parse_page_value(value)
+            if filter_status not in TASK_LIST_FILTERS:
+                filter_status = "all"
+
+            blocks = _task_list_blocks(channel_id, filter_status, page, cursor, direction)
+            say(
+                text="📋 タスク一覧",
+                blocks=blocks
+            )
+        except Exception as e:
+            say(text="❌ タスク一覧の表示中にエラーが発生しました")
+
     # タスク作成フォーム表示
     @app.action("show_task_create_form")
+    @run_in_background
     def handle_show_task_create_form(ack, body, say, client: WebClient):
         """タスク作成フォームを表示"""
         ack()
@@ -495,6 +555,7 @@ def register_channel_handlers(app: App):
 
     # タスク作成実行
     @app.action("execute_task_create")
+    @run_in_background
     def handle_execute_task_create(ack, body, say, client: WebClient):
         """タスク作成を実行"""
         ack()
@@ -545,6 +606,7 @@ def register_channel_handlers(app: App):
 
     # タスク作成キャンセル
     @app.action("cancel_task_create")
+    @run_in_background
     def handle_cancel_task_create(ack, body, say, client: WebClient):
         """タスク作成をキャンセル"""
         ack()
@@ -559,29 +621,24 @@ def register_channel_handlers(app: App):
 
     # タスクアクション（完了/削除）
     @app.action("task_action")
+    @run_in_background
     def handle_task_action(ack, body, say, client: WebClient):
         """タスクアクション（完了/削除）を処理"""
         ack()
         try:
             selected_option = body["actions"][0]["selected_option"]["value"]
-            channel_id = body["channel"]["id"]
 
             if selected_option.startswith("toggle_task_status_"):
                 task_id = selected_option.replace("toggle_task_status_", "")
 
-                # 現在のタスク状態を取得して切り替え
-                tasks = get_channel_tasks(channel_id)
-                current_task = next((t for t in tasks if t['id'] == task_id), None)
-
-                if current_task:
-                    new_status = 'completed' if current_task['status'] != 'completed' else 'pending'
-                    success = update_task_status(task_id, new_status)
+                # サーバー側で現在の状態を反転
+                updated_task = toggle_task_status(task_id)
 
-                    if success:
-                        status_text = "完了" if new_status == 'completed' else "未完了"
-                        say(text=f"✅ タスクを{status_text}に変更しました")
-                    else:
-                        say(text="❌ タスクの更新に失敗しました")
+                if updated_task:
+                    status_text = "完了" if updated_task['status'] == 'completed' else "未完了"
+                    say(text=f"✅ タスクを{status_text}に変更しました")
+                else:
+                    say(text="❌ タスクの更新に失敗しました")
 
             elif selected_option.startswith("delete_task_"):
                 task_id = selected_option.replace("delete_task_", "")
@@ -596,6 +653,8 @@ def register_channel_handlers(app: App):
             say(text="❌ タスクアクションの処理中にエラーが発生しました")
 
     # メモアクション（編集・削除）
+    # trigger_id はクリックから3秒で失効するため、モーダルを開く編集はキューを通さずに処理し、
+    # 削除のみバックグラウンドで実行する
     @app.action(re.compile(r"memo_actions_.+"))
     def handle_memo_action(ack, body, say, client: WebClient):
         """メモの編集・削除アクション"""
@@ -644,18 +703,22 @@ def register_channel_handlers(app: App):
 
                 elif selected_option.startswith("delete_memo_"):
                     memo_id = selected_option.replace("delete_memo_", "")
-                    success = delete_channel_memo(memo_id)
-
-                    if success:
-                        say(text="🗑️ メモを削除しました")
-                    else:
-                        say(text="❌ メモの削除に失敗しました")
+                    action_executor.submit((body.get("user") or {}).get("id"), _delete_memo, memo_id=memo_id, say=say)
 
         except Exception as e:
             say(text="❌ メモアクションの処理中にエラーが発生しました")
 
+    def _delete_memo(memo_id: str, say) -> None:
+        success = delete_channel_memo(memo_id)
+
+        if success:
+            say(text="🗑️ メモを削除しました")
+        else:
+            say(text="❌ メモの削除に失敗しました")
+
     # メモ編集モーダルの送信
     @app.view(re.compile(r"edit_memo_modal_.+"))
+    @run_in_background
     def handle_memo_edit_submission(ack, body, say, client: WebClient):
         """メモ編集モーダルの送信処理"""
         ack()
@@ -2,7 +2,7 @@
 チャンネルメモ機能
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from datetime import datetime
@@ -11,52 +11,65 @@ import re
 from db.repository import (
     search_channel_memos,
     get_channel_memo_stats,
-    get_recent_channel_memos
+    get_recent_channel_memos,
+    MEMO_PAGE_SIZE
 )
+from display.templates import cached_blocks
+
+
+def format_timestamp(value: Optional[datetime], fmt: str) -> str:
+    """リポジトリで JST に変換済みの日時を表示用に整形（不明な場合は「不明」）"""
+    return value.strftime(fmt) if value else "不明"
+
+
+def create_page_buttons(
+    action_id: str,
+    page: int,
+    next_cursor: Optional[str],
+    prev_cursor: Optional[str],
+    prefix: str = ""
+) -> Optional[Dict[str, Any]]:
+    """
+    ページ送りボタンを作成（前後のページがなければNone）
+
+    ボタンの value は "{prefix}{direction}:{移動先ページ}:{カーソル}"
+    """
+    elements = []
+    if prev_cursor:
+        elements.append({
+            "type": "button",
+            "text": {
+                "type": "plain_text",
+                "text": "◀ 前へ"
+            },
+            "value": f"{prefix}prev:{page - 1}:{prev_cursor}",
+            "action_id": f"{action_id}_prev"
+        })
+    if next_cursor:
+        elements.append({
+            "type": "button",
+            "text": {
+                "type": "plain_text",
+                "text": "次へ ▶"
+            },
+            "value": f"{prefix}next:{page + 1}:{next_cursor}",
+            "action_id": f"{action_id}_next"
+        })
+    if not elements:
+        return None
+    return {
+        "type": "actions",
+        "elements": elements
+    }
 
 
-def parse_datetime_safely(datetime_str: str) -> datetime:
-    """安全に日時文字列をパースし、日本時間に変換する"""
-    from datetime import timedelta, timezone
-
-    try:
-        # 基本的なISO形式のパース
-        clean_str = datetime_str.replace("Z", "+00:00")
-        dt = datetime.fromisoformat(clean_str)
-
-        # 日本時間（JST）に変換
-        jst = timezone(timedelta(hours=9))
-        if dt.tzinfo is None:
-            # タイムゾーン情報がない場合はUTCとして扱う
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(jst)
-
-    except ValueError:
-        try:
-            # マイクロ秒の桁数を調整して再試行
-            if '.' in clean_str and '+' in clean_str:
-                date_part, time_and_tz = clean_str.split('T')
-                time_part, tz_part = time_and_tz.rsplit('+', 1)
-                if '.' in time_part:
-                    time_base, microseconds = time_part.split('.')
-                    # マイクロ秒を6桁に調整
-                    microseconds = microseconds.ljust(6, '0')[:6]
-                    clean_str = f"{date_part}T{time_base}.{microseconds}+{tz_part}"
-                dt = datetime.fromisoformat(clean_str)
-
-                # 日本時間（JST）に変換
-                jst = timezone(timedelta(hours=9))
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                return dt.astimezone(jst)
-        except:
-            pass
-
-        # 最終的にフォールバック（現在時刻を日本時間で返す）
-        jst = timezone(timedelta(hours=9))
-        return datetime.now(jst)
+def parse_page_value(value: str) -> tuple[str, int, str]:
+    """ページ送りボタンの value を (direction, page, cursor) に分解"""
+    direction, page, cursor = value.split(":", 2)
+    return direction, int(page), cursor
 
 
+@cached_blocks
 def create_memo_search_input_blocks() -> list[Dict[str, Any]]:
     """メモ検索入力フォーム用のブロックを作成"""
     return [
@@ -71,7 +84,7 @@ def create_memo_search_input_blocks() -> list[Dict[str, Any]]:
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": "検索したいキーワードを入力してください："
+                "text": "検索したいキーワードを入力してください：\n空白区切りで AND、`or` で OR、`\"...\"` でフレーズ検索できます"
             }
         },
         {
@@ -138,8 +151,7 @@ def create_search_result_blocks(memos: List[Dict], keyword: str) -> list[Dict[st
     ]
 
     for memo in memos:
-        created_at = parse_datetime_safely(memo['created_at'])
-        formatted_date = created_at.strftime('%Y-%m-%d %H:%M')
+        formatted_date = format_timestamp(memo['created_at'], '%Y-%m-%d %H:%M')
 
         blocks.append({
             "type": "section",
@@ -277,8 +289,7 @@ def create_recent_memos_blocks(memos: List[Dict]) -> list[Dict[str, Any]]:
     ]
 
     for memo in memos:
-        created_at = parse_datetime_safely(memo['created_at'])
-        formatted_date = created_at.strftime('%Y-%m-%d %H:%M')
+        formatted_date = format_timestamp(memo['created_at'], '%Y-%m-%d %H:%M')
 
         blocks.append({
             "type": "section",
@@ -307,8 +318,13 @@ def create_recent_memos_blocks(memos: List[Dict]) -> list[Dict[str, Any]]:
     return blocks
 
 
-def create_memo_list_blocks(memos: List[Dict[str, Any]], page: int = 1) -> list[Dict[str, Any]]:
-    """メモ一覧表示用のブロックを作成"""
+def create_memo_list_blocks(
+    memos: List[Dict[str, Any]],
+    page: int = 1,
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None
+) -> list[Dict[str, Any]]:
+    """メモ一覧表示用のブロックを作成（1ページ分）"""
     blocks = [
         {
             "type": "header",
@@ -333,14 +349,14 @@ def create_memo_list_blocks(memos: List[Dict[str, Any]], page: int = 1) -> list[
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"*全{len(memos)}件のメモ*"
+                "text": f"*{len(memos)}件のメモ*（{page}ページ目）"
             }
         })
 
         # 各メモを表示
-        for i, memo in enumerate(memos[:30], 1):  # 最初の30件のみ表示
-            created_at = parse_datetime_safely(memo["created_at"])
-            jst_time = created_at.astimezone().strftime("%m/%d %H:%M")
+        offset = (page - 1) * MEMO_PAGE_SIZE
+        for i, memo in enumerate(memos, offset + 1):
+            jst_time = format_timestamp(memo["created_at"], "%m/%d %H:%M")
 
             memo_text = memo["message"]
             if len(memo_text) > 150:
@@ -386,17 +402,10 @@ def create_memo_list_blocks(memos: List[Dict[str, Any]], page: int = 1) -> list[
 
             blocks.append(block)
 
-        # 30件以上ある場合の注意書き
-        if len(memos) > 30:
-            blocks.append({
-                "type": "context",
-                "elements": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"💡 最新30件のみ表示しています。（全{len(memos)}件）"
-                    }
-                ]
-            })
+        # ページ送り
+        pager = create_page_buttons("memo_list_page", page, next_cursor, prev_cursor)
+        if pager:
+            blocks.append(pager)
 
     # メニューに戻るボタン
     blocks.append({
@@ -437,6 +446,7 @@ def create_memo_edit_modal_blocks(memo: Dict[str, Any]) -> list[Dict[str, Any]]:
     ]
 
 
+@cached_blocks
 def create_memo_create_form_blocks() -> list[Dict[str, Any]]:
     """メモ作成フォーム用のブロックを作成"""
     return [
@@ -6,6 +6,8 @@ from typing import Dict, Any
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from display.templates import cached_blocks
+
 
 def handle_channel_menu(message, say, client: WebClient):
     """チャンネルでメニューを表示（外部呼び出し用）"""
@@ -24,6 +26,7 @@ def handle_channel_menu(message, say, client: WebClient):
         say(text="❌ メニューの表示中にエラーが発生しました")
 
 
+@cached_blocks
 def create_channel_menu_blocks() -> list[Dict[str, Any]]:
     """チャンネルメニュー用のブロックを作成"""
     return [
@@ -72,6 +75,7 @@ def create_channel_menu_blocks() -> list[Dict[str, Any]]:
         }
     ]
 
+@cached_blocks
 def create_memo_management_blocks() -> list[Dict[str, Any]]:
     """メモ管理メニュー用のブロックを作成"""
     blocks = [
@@ -131,6 +135,7 @@ def create_memo_management_blocks() -> list[Dict[str, Any]]:
 
     return blocks
 
+@cached_blocks
 def create_channel_help_blocks() -> list[Dict[str, Any]]:
     """チャンネルヘルプ用のブロックを作成"""
     return [
@@ -2,7 +2,7 @@
 チャンネルタスク管理機能
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from datetime import datetime
@@ -13,9 +13,11 @@ from db.repository import (
     update_task_status,
     delete_task
 )
-from .memo import parse_datetime_safely
+from display.templates import cached_blocks
+from .memo import format_timestamp, create_page_buttons
 
 
+@cached_blocks
 def create_task_create_form_blocks() -> list[Dict[str, Any]]:
     """タスク作成フォーム用のブロックを作成"""
     return [
@@ -107,26 +109,37 @@ def create_filter_button(text: str, action_id: str, is_active: bool = False) ->
     return button
 
 
-def create_task_list_blocks(tasks: List[Dict], filter_status: str = "all") -> list[Dict[str, Any]]:
-    """タスク一覧表示用のブロックを作成"""
-    # フィルタリング
+def create_task_list_blocks(
+    tasks: List[Dict],
+    filter_status: str = "all",
+    page: int = 1,
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None,
+    filtered_count: Optional[int] = None,
+    total_count: Optional[int] = None
+) -> list[Dict[str, Any]]:
+    """
+    タスク一覧表示用のブロックを作成（1ページ分）
+
+    tasks はクエリ側で filter_status に絞り込み済みのもの。
+    filtered_count / total_count は絞り込み後・チャンネル全体の件数（取得できなければページ内の件数を表示）
+    """
     if filter_status == "completed":
-        filtered_tasks = [task for task in tasks if task.get('status') == 'completed']
         title = "📋 完了済みタスク"
     elif filter_status == "pending":
-        filtered_tasks = [task for task in tasks if task.get('status') != 'completed']
         title = "📋 未完了タスク"
     else:
-        filtered_tasks = tasks
         title = "📋 全てのタスク"
 
-    if not filtered_tasks:
+    if not tasks:
         empty_message = {
             "completed": "完了済みのタスクはありません。",
             "pending": "未完了のタスクはありません。",
             "all": "現在、登録されているタスクはありません。"
         }.get(filter_status, "タスクはありません。")
 
+        pager = create_page_buttons("task_list_page", page, next_cursor, prev_cursor, prefix=f"{filter_status}:")
+
         return [
             {
                 "type": "header",
@@ -151,6 +164,7 @@ def create_task_list_blocks(tasks: List[Dict], filter_status: str = "all") -> li
                     create_filter_button("✅ 完了済み", "show_task_list_completed", filter_status == "completed")
                 ]
             },
+            *([pager] if pager else []),
             {
                 "type": "actions",
                 "elements": [
@@ -178,7 +192,7 @@ def create_task_list_blocks(tasks: List[Dict], filter_status: str = "all") -> li
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"表示中: *{len(filtered_tasks)}件* / 全体: *{len(tasks)}件*"
+                "text": f"表示中: *{filtered_count if filtered_count is not None else len(tasks)}件* / 全体: *{total_count if total_count is not None else len(tasks)}件*（{page}ページ目）"
             }
         },
         # フィルターボタン
@@ -195,12 +209,11 @@ def create_task_list_blocks(tasks: List[Dict], filter_status: str = "all") -> li
         }
     ]
 
-    for task in filtered_tasks:
+    for task in tasks:
         status_emoji = "✅" if task['status'] == 'completed' else "⏳"
 
-        # 安全な日時パース関数を使用（日本時間に変換される）
-        created_at = parse_datetime_safely(task['created_at'])
-        formatted_date = created_at.strftime('%m/%d %H:%M')
+        # created_at はリポジトリで日本時間の datetime に変換済み
+        formatted_date = format_timestamp(task['created_at'], '%m/%d %H:%M')
 
         task_text = f"*{task['task_name']}* {status_emoji}\n"
         if task.get('description'):
@@ -236,6 +249,11 @@ def create_task_list_blocks(tasks: List[Dict], filter_status: str = "all") -> li
         })
         blocks.append({"type": "divider"})
 
+    # ページ送り
+    pager = create_page_buttons("task_list_page", page, next_cursor, prev_cursor, prefix=f"{filter_status}:")
+    if pager:
+        blocks.append(pager)
+
     # 戻るボタン
     blocks.append({
         "type": "actions",
@@ -254,6 +272,7 @@ def create_task_list_blocks(tasks: List[Dict], filter_status: str = "all") -> li
     return blocks
 
 
+@cached_blocks
 def create_task_management_blocks() -> list[Dict[str, Any]]:
     """タスク管理メニュー用のブロックを作成"""
     return [
@@ -4,10 +4,11 @@
 """
 
 import logging
-from datetime import datetime, timezone
 from typing import Any, Optional, List
 from boltApp import bolt_app
 from db.repository import save_channel_memo, search_channel_memos, get_channel_memo_stats
+from handlers.slack_cache import get_channel_name, get_user_name
+from handlers.channel.memo import format_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -41,23 +42,10 @@ def handle_channel_message(event: dict, say, client) -> None:
             return
 
         # チャンネル情報を取得
-        try:
-            channel_info = client.conversations_info(channel=channel_id)
-            channel_name = channel_info.get("channel", {}).get("name", "unknown")
-        except Exception as e:
-            channel_name = "unknown"
+        channel_name = get_channel_name(client, channel_id)
 
         # ユーザー情報を取得
-        try:
-            user_info = client.users_info(user=user_id)
-            user_profile = user_info.get("user", {}).get("profile", {})
-            user_name = (
-                user_profile.get("real_name") or
-                user_profile.get("display_name") or
-                user_info.get("user", {}).get("name", "unknown")
-            )
-        except Exception as e:
-            user_name = "unknown"
+        user_name = get_user_name(client, user_id, "unknown")
 
         # パーマリンクを生成
         try:
@@ -141,8 +129,7 @@ def handle_memo_search(event: dict, say, client) -> None:
         ]
 
         for memo in memos:
-            created_at = datetime.fromisoformat(memo["created_at"].replace("Z", "+00:00"))
-            jst_time = created_at.astimezone(timezone.utc).strftime("%m/%d %H:%M")
+            jst_time = format_timestamp(memo["created_at"], "%m/%d %H:%M")
 
             memo_text = memo["message"]
             if len(memo_text) > 100:
@@ -176,7 +163,7 @@ def handle_memo_search(event: dict, say, client) -> None:
                 "elements": [
                     {
                         "type": "mrkdwn",
-                        "text": "💡 最新10件のみ表示しています。より具体的なキーワードで検索すると、より関連性の高い結果が得られます。"
+                        "text": "💡 関連度の高い10件のみ表示しています。空白区切りで AND、`or` で OR、`\"...\"` でフレーズ検索できます。"
                     }
                 ]
             })
@@ -210,11 +197,7 @@ def handle_memo_stats(event: dict, say, client) -> None:
             return
 
         # チャンネル名を取得
-        try:
-            channel_info = client.conversations_info(channel=channel_id)
-            channel_name = channel_info.get("channel", {}).get("name", "unknown")
-        except Exception:
-            channel_name = "unknown"
+        channel_name = get_channel_name(client, channel_id)
 
         blocks = [
             {
@@ -323,8 +306,7 @@ def handle_channel_memo_logic(event, body, say, client):
             ]
 
             for memo in memos[:10]:  # 最大10件
-                created_at = datetime.fromisoformat(memo["created_at"].replace("Z", "+00:00"))
-                jst_time = created_at.astimezone(timezone.utc).strftime("%m/%d %H:%M")
+                jst_time = format_timestamp(memo["created_at"], "%m/%d %H:%M")
 
                 memo_text = memo["message"]
                 if len(memo_text) > 100:
@@ -0,0 +1,59 @@
+"""
+テキストコマンドのルーター
+
+メッセージ先頭の語を正規化して辞書で引き、対応するハンドラーを返す。
+エイリアスは各モジュールでデータとして宣言し、登録時に辞書へ展開する。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Optional
+
+
+class CommandRouter:
+    """先頭語（と引数の有無）からハンドラーを O(1) で引くルーター"""
+
+    def __init__(self):
+        # (正規化した先頭語, 引数ありか) -> ハンドラー
+        self._routes: dict[tuple[str, bool], Callable[..., Any]] = {}
+        self._max_head = 0
+
+    @staticmethod
+    def normalize(token: str) -> str:
+        return token.casefold()
+
+    def add(self, aliases: Iterable[str], handler: Callable[..., Any], with_args: bool = False) -> None:
+        """
+        エイリアスを登録
+
+        Args:
+            aliases: 先頭語の候補（大文字/小文字は区別しない）
+            handler: 呼び出すハンドラー
+            with_args: True なら「先頭語 + 引数」、False なら先頭語のみのメッセージに一致
+        """
+        for alias in aliases:
+            key = (self.normalize(alias), with_args)
+            if key in self._routes:
+                raise ValueError(f"Duplicate command alias: {alias}")
+            self._routes[key] = handler
+            self._max_head = max(self._max_head, len(alias))
+
+    def resolve(self, text: str) -> Optional[tuple[Callable[..., Any], str]]:
+        """
+        メッセージに対応する (ハンドラー, 引数) を返す（コマンドでなければ None）
+
+        先頭語より長い語で始まるメッセージ（通常の会話）は本文全体を走査せずに弾く。
+        """
+        text = (text or "").strip()
+        if not text:
+            return None
+        window = text[:self._max_head + 1]
+        head = window.split(None, 1)[0]
+        if len(head) > self._max_head:
+            return None
+
+        rest = text[len(head):].strip()
+        handler = self._routes.get((self.normalize(head), bool(rest)))
+        if handler is None:
+            return None
+        return handler, rest
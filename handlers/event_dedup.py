@@ -0,0 +1,65 @@
+"""
+Slack イベント再送の重複排除
+
+応答が遅れると Slack は同じイベントを X-Slack-Retry-Num 付きで再送するため、
+event_id / client_msg_id を TTL 付きの有限集合に記録し、2回目以降はリスナーに渡さない。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Callable
+
+from cachetools import TTLCache
+from slack_bolt import BoltRequest, BoltResponse
+from slack_bolt.middleware import Middleware
+
+
+class EventDeduplicator(Middleware):
+    """処理済みの event_id / client_msg_id を ack だけして打ち切るグローバルミドルウェア"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._seen: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._counters = {"first": 0, "duplicate": 0}
+
+    @staticmethod
+    def _keys(body: dict[str, Any]) -> list[str]:
+        keys = []
+        if body.get("event_id"):
+            keys.append(f"event:{body['event_id']}")
+        event = body.get("event") or {}
+        if event.get("client_msg_id"):
+            keys.append(f"msg:{event['client_msg_id']}")
+        return keys
+
+    def is_first_delivery(self, body: dict[str, Any]) -> bool:
+        """初回の配信なら記録して True、既に受け付けたイベントなら False"""
+        keys = self._keys(body)
+        if not keys:
+            return True
+        with self._lock:
+            if any(key in self._seen for key in keys):
+                self._counters["duplicate"] += 1
+                return False
+            for key in keys:
+                self._seen[key] = True
+            self._counters["first"] += 1
+        return True
+
+    def process(self, *, req: BoltRequest, resp: BoltResponse, next: Callable[[], BoltResponse]) -> BoltResponse:
+        if self.is_first_delivery(req.body):
+            return next()
+        return BoltResponse(status=200, body="")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._counters, "tracked": len(self._seen)}
+
+
+event_deduplicator = EventDeduplicator(
+    maxsize=int(os.getenv("EVENT_DEDUP_SIZE", "10000")),
+    # Slack の再送は最大で約5分後まで
+    ttl=float(os.getenv("EVENT_DEDUP_TTL", "900")),
+)
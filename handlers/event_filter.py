@@ -0,0 +1,61 @@
+"""
+メッセージイベントの事前フィルター
+
+チャンネルに参加しているだけで全発言が届くため、コマンドでないメッセージや
+subtype 付き（編集・削除・参加通知など）/ bot のメッセージはリスナーの照合前に捨てる。
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable
+
+from slack_bolt import BoltRequest, BoltResponse
+from slack_bolt.middleware import Middleware
+
+from handlers.commands import CommandRouter
+
+# 前段（asgi_app の非同期ミドルウェア）で判定済みのリクエストに付ける context のキー
+PREFILTER_PASSED = "message_prefilter_passed"
+
+
+class MessagePrefilter(Middleware):
+    """コマンドに一致しない message イベントを ack だけして打ち切るグローバルミドルウェア"""
+
+    def __init__(self, channel_router: CommandRouter, dm_router: CommandRouter):
+        self._channel_router = channel_router
+        self._dm_router = dm_router
+        self._lock = threading.Lock()
+        self._counters = {"passed": 0, "dropped_subtype": 0, "dropped_bot": 0, "dropped_chatter": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def should_dispatch(self, body: dict[str, Any]) -> bool:
+        """リスナーに渡すべきリクエストか（message イベント以外は常に True）"""
+        event = body.get("event")
+        if not event or event.get("type") != "message":
+            return True
+        if event.get("subtype"):
+            self._count("dropped_subtype")
+            return False
+        if event.get("bot_id"):
+            self._count("dropped_bot")
+            return False
+        router = self._dm_router if event.get("channel_type") == "im" else self._channel_router
+        if router.resolve(event.get("text", "")) is None:
+            self._count("dropped_chatter")
+            return False
+        self._count("passed")
+        return True
+
+    def process(self, *, req: BoltRequest, resp: BoltResponse, next: Callable[[], BoltResponse]) -> BoltResponse:
+        # 判定済みのリクエストは二重に数えない
+        if req.context.get(PREFILTER_PASSED) or self.should_dispatch(req.body):
+            return next()
+        return BoltResponse(status=200, body="")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
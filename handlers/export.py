@@ -0,0 +1,126 @@
+"""
+DM からのデータエクスポート
+
+    エクスポート <works|attendance|channel_memos|channel_tasks> [開始日] [終了日] [csv|parquet]
+
+送信したユーザー自身の行（works/attendance は users.id、メモ/タスクは Slack ユーザーID）を
+db.export で一時ファイルに書き出し、DM にアップロードする。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from datetime import date
+from typing import Any, Optional
+
+from db.export import EXPORT_FORMATS, EXPORT_SPECS, export_table, parquet_available
+from db.repository import get_or_create_user
+from handlers.background import export_executor
+from handlers.slack_cache import get_display_name
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COMMAND_ALIASES = ("エクスポート", "export")
+
+EXPORT_USAGE = (
+    "📤 *エクスポートの使い方*\n"
+    "`エクスポート <テーブル> [開始日] [終了日] [csv|parquet]`\n"
+    f"• テーブル: {' / '.join(f'`{name}`' for name in EXPORT_SPECS)}\n"
+    "• 日付は YYYY-MM-DD（日本時間、終了日を含む）\n"
+    "• 例: `エクスポート works 2024-01-01 2024-01-31`"
+)
+
+
+def parse_export_args(args: str) -> tuple[str, Optional[date], Optional[date], str]:
+    """引数を (テーブル, 開始日, 終了日, 形式) に分解（不正な場合は ValueError）"""
+    tokens = args.split()
+    if not tokens or tokens[0] not in EXPORT_SPECS:
+        raise ValueError("テーブル名が正しくありません")
+    table, rest = tokens[0], tokens[1:]
+
+    fmt = "csv"
+    if rest and rest[-1].lower() in EXPORT_FORMATS:
+        fmt = rest.pop().lower()
+    if fmt == "parquet" and not parquet_available():
+        raise ValueError("この環境では Parquet を書き出せません（pyarrow が未インストール）。csv を指定してください")
+    if len(rest) > 2:
+        raise ValueError("引数が多すぎます")
+
+    try:
+        dates = [date.fromisoformat(token) for token in rest]
+    except ValueError:
+        raise ValueError("日付は YYYY-MM-DD で指定してください")
+    date_from = dates[0] if dates else None
+    date_to = dates[1] if len(dates) > 1 else None
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("開始日が終了日より後になっています")
+    return table, date_from, date_to, fmt
+
+
+def show_export_usage(event, body, say, client) -> None:
+    say(text=EXPORT_USAGE)
+
+
+def export_for_user(event, body, say, client, args: str) -> None:
+    """引数を検証し、書き出しとアップロードはエクスポート専用のワーカーで行う"""
+    try:
+        table, date_from, date_to, fmt = parse_export_args(args)
+    except ValueError as e:
+        say(text=f"❌ {e}\n{EXPORT_USAGE}")
+        return
+
+    slack_user_id = event.get("user")
+    say(text=f"⏳ `{table}` を書き出しています…")
+    export_executor.submit(
+        slack_user_id,
+        _run_export,
+        slack_user_id=slack_user_id,
+        channel_id=event.get("channel"),
+        table=table,
+        date_from=date_from,
+        date_to=date_to,
+        fmt=fmt,
+        say=say,
+        client=client,
+    )
+
+
+def _run_export(
+    slack_user_id: str,
+    channel_id: str,
+    table: str,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    fmt: str,
+    say: Any,
+    client: Any
+) -> None:
+    if table in ("works", "attendance"):
+        user = get_or_create_user(slack_user_id or "unknown", get_display_name(client, slack_user_id))
+        owner_id = user.id
+    else:
+        owner_id = slack_user_id
+
+    period = "_".join(d.strftime("%Y%m%d") for d in (date_from, date_to) if d)
+    filename = f"{table}{'_' + period if period else ''}.{fmt}"
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            count = export_table(table, stream, fmt, date_from, date_to, owner_id)
+        if count == 0:
+            say(text=f"📭 `{table}` に該当するデータはありません。")
+            return
+        client.files_upload_v2(
+            channel=channel_id,
+            file=path,
+            filename=filename,
+            title=filename,
+            initial_comment=f"📤 `{table}` を {count}件 書き出しました。",
+        )
+    except Exception as e:
+        logger.warning(f"Export failed for {table}: {e}")
+        say(text="❌ エクスポート中にエラーが発生しました")
+    finally:
+        os.remove(path)
@@ -0,0 +1,250 @@
+"""
+Slack Web API 参照結果のプロセス内キャッシュ
+ユーザープロフィールやチャンネル名など、クリックのたびに再取得していた情報を TTL + LRU で保持する
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from cachetools import TTLCache
+
+from boltApp import bolt_app
+
+logger = logging.getLogger(__name__)
+
+
+class SlackLookupCache:
+    """TTL・LRU・同時リクエスト集約付きのキャッシュ"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        # key -> (完了イベント, 結果格納用リスト)
+        self._inflight: dict[str, tuple[threading.Event, list[Any]]] = {}
+
+    def get(self, key: str, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        キャッシュから取得し、なければ loader で取得して保存
+
+        同じキーの取得が進行中の場合は、その結果を待って共有する。
+        loader が None を返した（取得失敗）場合はキャッシュしない。
+        """
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = (threading.Event(), [])
+                self._inflight[key] = pending
+                is_owner = True
+            else:
+                is_owner = False
+
+        done, holder = pending
+        if not is_owner:
+            done.wait()
+            return holder[0] if holder else None
+
+        value = None
+        try:
+            value = loader()
+        except Exception as e:
+            logger.warning(f"Slack lookup failed for {key}: {e}")
+        finally:
+            with self._lock:
+                if value is not None:
+                    self._cache[key] = value
+                self._inflight.pop(key, None)
+            holder.append(value)
+            done.set()
+        return value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """キャッシュ済みの値のみ返す（取得は行わない）"""
+        with self._lock:
+            return self._cache.get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+# ===== ユーザープロフィール =====
+
+_profile_cache = SlackLookupCache(
+    maxsize=int(os.getenv("SLACK_PROFILE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SLACK_PROFILE_CACHE_TTL", "600")),
+)
+
+
+def _profile_from_user(user: dict[str, Any]) -> dict[str, Optional[str]]:
+    profile = user.get("profile", {}) or {}
+    return {
+        "real_name": profile.get("real_name"),
+        "display_name": profile.get("display_name"),
+        "name": user.get("name"),
+    }
+
+
+def _load_profile(client, user_id: str) -> Optional[dict[str, Optional[str]]]:
+    try:
+        user_info = client.users_info(user=user_id)
+        return _profile_from_user(user_info.get("user", {}) or {})
+    except Exception:
+        # users:read がない場合は users.profile:read で取得
+        prof = client.users_profile_get(user=user_id)
+        profile = prof.get("profile", {}) or {}
+        return {
+            "real_name": profile.get("real_name"),
+            "display_name": profile.get("display_name"),
+            "name": None,
+        }
+
+
+def get_user_profile(client, user_id: Optional[str]) -> Optional[dict[str, Optional[str]]]:
+    """ユーザーのプロフィール（real_name, display_name, name）を取得"""
+    if not client or not user_id:
+        return None
+    return _profile_cache.get(user_id, lambda: _load_profile(client, user_id))
+
+
+def get_display_name(client, user_id: Optional[str]) -> Optional[str]:
+    """real_name または display_name を返す（取得できない場合は None）"""
+    profile = get_user_profile(client, user_id)
+    if not profile:
+        return None
+    return profile.get("real_name") or profile.get("display_name")
+
+
+def get_user_name(client, user_id: Optional[str], default: str = "Unknown User") -> str:
+    """表示用ユーザー名を返す（real_name → display_name → name → default）"""
+    profile = get_user_profile(client, user_id)
+    if not profile:
+        return default
+    return profile.get("real_name") or profile.get("display_name") or profile.get("name") or default
+
+
+async def async_get_user_name(client, user_id: Optional[str], default: str = "Unknown User") -> str:
+    """get_user_name の AsyncWebClient 版"""
+    if not client or not user_id:
+        return default
+    profile = _profile_cache.peek(user_id)
+    if profile is None:
+        try:
+            user_info = await client.users_info(user=user_id)
+            profile = _profile_from_user(user_info.get("user", {}) or {})
+            _profile_cache.put(user_id, profile)
+        except Exception as e:
+            logger.warning(f"Slack lookup failed for {user_id}: {e}")
+            return default
+    return profile.get("real_name") or profile.get("display_name") or profile.get("name") or default
+
+
+def invalidate_user_profile(user_id: str) -> None:
+    _profile_cache.invalidate(user_id)
+
+
+@bolt_app.event("user_change")
+def handle_user_change(event, logger):
+    """プロフィール更新時にキャッシュを差し替え"""
+    user = event.get("user", {}) or {}
+    user_id = user.get("id")
+    if not user_id:
+        return
+    if user.get("deleted"):
+        invalidate_user_profile(user_id)
+    else:
+        _profile_cache.put(user_id, _profile_from_user(user))
+
+
+# ===== チャンネル情報 =====
+
+_channel_cache = SlackLookupCache(
+    maxsize=int(os.getenv("SLACK_CHANNEL_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("SLACK_CHANNEL_CACHE_TTL", "3600")),
+)
+
+
+def _load_channel_name(client, channel_id: str) -> Optional[str]:
+    channel_info = client.conversations_info(channel=channel_id)
+    return channel_info.get("channel", {}).get("name")
+
+
+def get_channel_name(client, channel_id: Optional[str], default: str = "unknown") -> str:
+    """チャンネル名を返す（取得できない場合は default）"""
+    if not client or not channel_id:
+        return default
+    return _channel_cache.get(channel_id, lambda: _load_channel_name(client, channel_id)) or default
+
+
+async def async_get_channel_name(client, channel_id: Optional[str], default: str = "unknown") -> str:
+    """get_channel_name の AsyncWebClient 版"""
+    if not client or not channel_id:
+        return default
+    name = _channel_cache.peek(channel_id)
+    if name is None:
+        try:
+            channel_info = await client.conversations_info(channel=channel_id)
+            name = channel_info.get("channel", {}).get("name")
+        except Exception as e:
+            logger.warning(f"Slack lookup failed for {channel_id}: {e}")
+        if name:
+            _channel_cache.put(channel_id, name)
+    return name or default
+
+
+def prewarm_channel_cache(client, limit: int = 200) -> int:
+    """
+    conversations_list でチャンネル名をまとめてキャッシュに載せる
+
+    Returns:
+        キャッシュしたチャンネル数
+    """
+    count = 0
+    cursor = None
+    try:
+        while True:
+            res = client.conversations_list(
+                types="public_channel,private_channel",
+                exclude_archived=True,
+                limit=limit,
+                cursor=cursor,
+            )
+            for channel in res.get("channels", []) or []:
+                if channel.get("id") and channel.get("name"):
+                    _channel_cache.put(channel["id"], channel["name"])
+                    count += 1
+            cursor = (res.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
+    except Exception as e:
+        logger.warning(f"Channel cache prewarm failed: {e}")
+    return count
+
+
+@bolt_app.event("channel_rename")
+def handle_channel_rename(event, logger):
+    """チャンネル名変更をキャッシュに反映"""
+    channel = event.get("channel", {}) or {}
+    if channel.get("id") and channel.get("name"):
+        _channel_cache.put(channel["id"], channel["name"])
+
+
+@bolt_app.event("channel_created")
+def handle_channel_created(event, logger):
+    """新規チャンネルをキャッシュに追加"""
+    channel = event.get("channel", {}) or {}
+    if channel.get("id") and channel.get("name"):
+        _channel_cache.put(channel["id"], channel["name"])
@@ -1,6 +1,73 @@
 from datetime import datetime, timezone, timedelta
 from boltApp import bolt_app
 from db.repository import start_work as repo_start_work, get_or_create_user
+from handlers.slack_cache import get_display_name
+from handlers.background import run_in_background
+from display.templates import BlockTemplate
+
+
+_START_WORK_FORM = BlockTemplate([
+	{
+		"type": "header",
+		"text": {
+			"type": "plain_text",
+			"text": "開始日時を選択",
+			"emoji": True
+		}
+	},
+	{
+		"type": "actions",
+		"elements": [
+			{
+				"type": "datepicker",
+				"initial_date": "{{initial_date}}",
+				"placeholder": {
+					"type": "plain_text",
+					"text": "Select a date",
+					"emoji": True
+				},
+				"action_id": "datapicker"
+			},
+			{
+				"type": "timepicker",
+				"initial_time": "{{initial_time}}",
+				"placeholder": {
+					"type": "plain_text",
+					"text": "Select time",
+					"emoji": True
+				},
+				"action_id": "timepicker"
+			}
+		]
+	},
+	{
+		"type": "actions",
+		"elements": [
+			{
+				"type": "button",
+				"text": {
+					"type": "plain_text",
+					"text": "決定",
+					"emoji": True
+				},
+				"style": "primary",
+				"value": "click_me_123",
+				"action_id": "save_start_time"
+			},
+			{
+				"type": "button",
+				"text": {
+					"type": "plain_text",
+					"text": "キャンセル",
+					"emoji": True
+				},
+				"value": "click_me_123",
+				"action_id": "cancel_start_time"
+			}
+		]
+	}
+])
+
 
 def start_work(say) -> None:
 	# 現在のローカル時刻から日付と時間の文字列を生成
@@ -8,71 +75,12 @@ def start_work(say) -> None:
 	initial_date = now.strftime("%Y-%m-%d")
 	initial_time = now.strftime("%H:%M")
 
-	blocks = [
-		{
-			"type": "header",
-			"text": {
-				"type": "plain_text",
-				"text": "開始日時を選択",
-				"emoji": True
-			}
-		},
-		{
-			"type": "actions",
-			"elements": [
-				{
-					"type": "datepicker",
-					"initial_date": initial_date,
-					"placeholder": {
-						"type": "plain_text",
-						"text": "Select a date",
-						"emoji": True
-					},
-					"action_id": "datapicker"
-				},
-				{
-					"type": "timepicker",
-					"initial_time": initial_time,
-					"placeholder": {
-						"type": "plain_text",
-						"text": "Select time",
-						"emoji": True
-					},
-					"action_id": "timepicker"
-				}
-			]
-		},
-		{
-			"type": "actions",
-			"elements": [
-				{
-					"type": "button",
-					"text": {
-						"type": "plain_text",
-						"text": "決定",
-						"emoji": True
-					},
-					"style": "primary",
-					"value": "click_me_123",
-					"action_id": "save_start_time"
-				},
-				{
-					"type": "button",
-					"text": {
-						"type": "plain_text",
-						"text": "キャンセル",
-						"emoji": True
-					},
-					"value": "click_me_123",
-					"action_id": "cancel_start_time"
-				}
-			]
-		}
-	]
+	blocks = _START_WORK_FORM.render(initial_date=initial_date, initial_time=initial_time)
 	say(blocks=blocks, text="開始時間を選択してください。")
 
 
 @bolt_app.action("save_start_time")
+@run_in_background
 def save_start_time(ack, body, say, client):
 	ack()
 	# ユーザーが選択した開始日時を取得（block_id が動的なため values を走査）
@@ -99,9 +107,7 @@ def save_start_time(ack, body, say, client):
 			user_slack_id = body.get("user", {}).get("id") or body.get("event", {}).get("user")
 			if not user_slack_id and isinstance(body.get("authorizations"), list) and body["authorizations"]:
 				user_slack_id = body["authorizations"][0].get("user_id")
-			if user_slack_id and client:
-				prof = client.users_profile_get(user=user_slack_id)
-				display_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
+			display_name = get_display_name(client, user_slack_id)
 		except Exception:
 			pass
 
@@ -125,6 +131,7 @@ def save_start_time(ack, body, say, client):
 		say(text="開始日時の選択を取得できませんでした。もう一度お試しください。")
 
 @bolt_app.action("cancel_start_time")
+@run_in_background
 def cancel_start_time(ack, body, say, client=None):
 	ack()
 	say(text="開始日時の選択がキャンセルされました。メニューに戻ります。")
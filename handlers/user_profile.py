@@ -6,6 +6,8 @@ from typing import Any
 
 from boltApp import bolt_app
 from db.repository import get_or_create_user, update_user, get_work_hours_by_month, delete_work_record
+from handlers.slack_cache import get_display_name
+from handlers.background import run_in_background
 
 
 def format_work_time_display(start_dt: datetime, end_dt: datetime | None, target_year: int, target_month: int) -> str:
@@ -86,34 +88,25 @@ def show_user_info(say, real_name: str | None, slack_user_id: str | None = None)
 
 
 @bolt_app.action("view_user_info")
+@run_in_background
 def view_user_info(ack, body, say, client):  # type: ignore[no-redef]
     ack()
     user_slack_id = body.get("user", {}).get("id")
-    real_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    real_name = get_display_name(client, user_slack_id)
     show_user_info(say, real_name, user_slack_id)
 
 
 @bolt_app.action("back_to_user_menu")
+@run_in_background
 def back_to_user_menu(ack, body, say, client):  # type: ignore[no-redef]
     ack()
     user_slack_id = body.get("user", {}).get("id")
-    real_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    real_name = get_display_name(client, user_slack_id)
     show_or_edit_user(say, real_name, user_slack_id)
 
 
 @bolt_app.action("check_work_hours")
+@run_in_background
 def check_work_hours(ack, body, say):  # type: ignore[no-redef]
     ack()
 
@@ -134,6 +127,7 @@ def check_work_hours(ack, body, say):  # type: ignore[no-redef]
 
 
 @bolt_app.action("delete_work_hours")
+@run_in_background
 def delete_work_hours(ack, body, say):  # type: ignore[no-redef]
     ack()
 
@@ -154,17 +148,12 @@ def delete_work_hours(ack, body, say):  # type: ignore[no-redef]
 
 
 @bolt_app.action("confirm_work_hours")
+@run_in_background
 def confirm_work_hours(ack, body, say, client):  # type: ignore[no-redef]
     ack()
 
     user_slack_id = body.get("user", {}).get("id")
-    real_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    real_name = get_display_name(client, user_slack_id)
 
     user = get_or_create_user(user_slack_id or "unknown", real_name)
 
@@ -205,48 +194,19 @@ def confirm_work_hours(ack, body, say, client):  # type: ignore[no-redef]
         say(f"📅 {year}年{month}月の勤務記録はありません。")
         return
 
-    # 詳細一覧を作成
+    # 詳細一覧を作成（月内の勤務時間・月またぎはリポジトリで計算済み）
     work_details = []
-    jst_tz = timezone(timedelta(hours=9))
-    month_end = datetime(year + (1 if month == 12 else 0), (1 if month == 12 else month + 1), 1, tzinfo=jst_tz)
 
     for record in work_records:
-        start_dt = datetime.fromisoformat(record["start_time"].replace("Z", "+00:00"))
+        time_display = format_work_time_display(record["start_dt"], record["end_dt"], year, month)
 
         # 終了時刻がある場合とない場合で処理を分ける
-        if record.get("end_time"):
-            end_dt = datetime.fromisoformat(record["end_time"].replace("Z", "+00:00"))
-
-            # 月をまたぐ場合の実効終了時刻
-            effective_end = min(end_dt, month_end.astimezone(timezone.utc))
-
-            # 時間表示をフォーマット
-            time_display = format_work_time_display(start_dt, end_dt, year, month)
-
-            # 実際の勤務時間を計算（月内分のみ）
-            work_duration = effective_end - start_dt
-            break_minutes = record.get("break_time_min", 0) or 0
-
-            # 月をまたぐ場合の休憩時間比例配分
-            total_duration = end_dt - start_dt
-            if total_duration.total_seconds() > 0:
-                break_ratio = work_duration.total_seconds() / total_duration.total_seconds()
-                effective_break_minutes = break_minutes * break_ratio
-            else:
-                effective_break_minutes = 0
-
-            work_minutes = work_duration.total_seconds() / 60 - effective_break_minutes
-            work_hours = max(0, work_minutes / 60)
-
+        if record["end_dt"]:
             # 月をまたぐ場合は注記を追加
-            note = ""
-            if end_dt > month_end.astimezone(timezone.utc):
-                note = " *（月をまたぐため月内分のみ）*"
-
-            work_details.append(f"• {time_display} ({work_hours:.2f}時間){note}")
+            note = " *（月をまたぐため月内分のみ）*" if record["crosses_month"] else ""
+            work_details.append(f"• {time_display} ({record['work_hours']:.2f}時間){note}")
         else:
             # 未終了の場合
-            time_display = format_work_time_display(start_dt, None, year, month)
             work_details.append(f"• {time_display} *（未終了）*")
 
     # 詳細リストを文字列として結合
@@ -267,17 +227,12 @@ def confirm_work_hours(ack, body, say, client):  # type: ignore[no-redef]
 
 
 @bolt_app.action("confirm_delete_work_hours")
+@run_in_background
 def confirm_delete_work_hours(ack, body, say, client):  # type: ignore[no-redef]
     ack()
 
     user_slack_id = body.get("user", {}).get("id")
-    real_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    real_name = get_display_name(client, user_slack_id)
 
     user = get_or_create_user(user_slack_id or "unknown", real_name)
 
@@ -339,8 +294,8 @@ def confirm_delete_work_hours(ack, body, say, client):  # type: ignore[no-redef]
         else:
             number_str = around_numbers[number_index]
 
-        start_time = datetime.fromisoformat(record["start_time"].replace("Z", "+00:00"))
-        end_time = datetime.fromisoformat(record["end_time"].replace("Z", "+00:00")) if record.get("end_time") else None
+        start_time = record["start_dt"]
+        end_time = record["end_dt"]
 
         # JSTに変換
         jst_start = start_time.astimezone(timezone(timedelta(hours=9)))
@@ -378,6 +333,7 @@ def confirm_delete_work_hours(ack, body, say, client):  # type: ignore[no-redef]
 
 
 @bolt_app.action(re.compile(r"delete_work_record_.*"))
+@run_in_background
 def handle_delete_work_record(ack, body, say):  # type: ignore[no-redef]
     ack()
 
@@ -397,6 +353,7 @@ def handle_delete_work_record(ack, body, say):  # type: ignore[no-redef]
 
 
 @bolt_app.action(re.compile(r"confirm_delete_.*"))
+@run_in_background
 def handle_confirm_delete(ack, body, say, client):  # type: ignore[no-redef]
     ack()
 
@@ -413,27 +370,16 @@ def handle_confirm_delete(ack, body, say, client):  # type: ignore[no-redef]
 
     # ユーザーメニューに戻る
     user_slack_id = body.get("user", {}).get("id")
-    real_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    real_name = get_display_name(client, user_slack_id)
     show_or_edit_user(say, real_name, user_slack_id)
 
 
 @bolt_app.action("edit_user")
+@run_in_background
 def edit_user(ack, body, say, client):  # type: ignore[no-redef]
     ack()
     user_slack_id = body.get("user", {}).get("id")
-    real_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    real_name = get_display_name(client, user_slack_id)
     user = get_or_create_user(user_slack_id or "unknown", real_name)
 
     blocks = [
@@ -451,16 +397,11 @@ def edit_user(ack, body, say, client):  # type: ignore[no-redef]
 
 
 @bolt_app.action("save_user")
+@run_in_background
 def save_user(ack, body, say, client):  # type: ignore[no-redef]
     ack()
     user_slack_id = body.get("user", {}).get("id")
-    real_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            real_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    real_name = get_display_name(client, user_slack_id)
     user = get_or_create_user(user_slack_id or "unknown", real_name)
 
     values = body.get("state", {}).get("values", {})
@@ -483,6 +424,7 @@ def save_user(ack, body, say, client):  # type: ignore[no-redef]
     show_or_edit_user(say, real_name, user_slack_id)
 
 @bolt_app.action("back_to_menu")
+@run_in_background
 def back_to_menu(ack, body, say):
     ack()
     from display.menu import display_menu
@@ -4,6 +4,8 @@ from datetime import datetime, timezone, timedelta
 
 from boltApp import bolt_app
 from db.repository import start_work as repo_start_work, end_work as repo_end_work, get_active_work_start_time
+from handlers.slack_cache import get_display_name
+from handlers.background import run_in_background
 
 def prompt_start_work(say) -> None:
     # kept for potential future expansion (now handled in handlers.startWork)
@@ -122,16 +124,11 @@ def prompt_end_work(say, values=None, error_message=None, user_id=None) -> None:
 
 
 @bolt_app.action("save_end_time")
+@run_in_background
 def save_end_time(ack, body, say, client):  # type: ignore[no-redef]
     ack()
     user_slack_id = body.get("user", {}).get("id")
-    display_name = None
-    if user_slack_id:
-        try:
-            prof = client.users_profile_get(user=user_slack_id)
-            display_name = prof.get("profile", {}).get("real_name") or prof.get("profile", {}).get("display_name")
-        except Exception:
-            pass
+    display_name = get_display_name(client, user_slack_id)
 
     from db.repository import get_or_create_user
     user = get_or_create_user(user_slack_id or "unknown", display_name)
@@ -213,6 +210,7 @@ def save_end_time(ack, body, say, client):  # type: ignore[no-redef]
 
 
 @bolt_app.action("cancel_end_time")
+@run_in_background
 def cancel_end_time(ack, body, say, client=None):  # type: ignore[no-redef]
     ack()
     say("退勤入力をキャンセルしました。メニューに戻ります。")